@@ -0,0 +1,72 @@
+''' Benchmark: import time of the slackTools package
+
+Usage: python benchmarks/bench_import.py [repeat] [--max-ms MS]
+Each measurement runs in a fresh interpreter. With --max-ms, exits with an error
+when `import slackTools` is slower than MS milliseconds (above a bare interpreter),
+or when it imports one of the dependencies that must only load on first use.
+'''
+# Standard Library
+import os
+import sys
+import json
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Must not be imported by `import slackTools`
+DEFERRED = ('slack_sdk', 'aiohttp', 'random_word', 'toml', 'sqlite3')
+
+STATEMENTS = {
+    "python": "pass",
+    "import slackTools": "import slackTools",
+    "slackTools.SlackTools_bot": "import slackTools; slackTools.SlackTools_bot",
+    "slackTools.SlackTools_webhook": "import slackTools; slackTools.SlackTools_webhook",
+}
+
+PROBE = '''
+import sys, time, json
+t0 = time.perf_counter()
+{statement}
+t1 = time.perf_counter()
+print(json.dumps({{"seconds": t1 - t0, "modules": sorted(sys.modules)}}))
+'''
+
+
+def measure(statement, repeat):
+    ''' Best time over repeat fresh interpreters, and the modules loaded '''
+    best, modules = None, []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, '-c', PROBE.format(statement=statement)],
+            cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        result = json.loads(out)
+        if best is None or result["seconds"] < best:
+            best, modules = result["seconds"], result["modules"]
+    return best, modules
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    max_ms = None
+    if '--max-ms' in args:
+        i = args.index('--max-ms')
+        max_ms = float(args[i + 1])
+        del args[i:i + 2]
+    repeat = int(args[0]) if args else 10
+
+    results = {name: measure(statement, repeat) for name, statement in STATEMENTS.items()}
+    baseline = results["python"][0]
+    print(f"Import time, best of {repeat} fresh interpreters")
+    for name, (seconds, _) in results.items():
+        print(f"  {name:<32} {(seconds - baseline) * 1e3:8.2f} ms")
+
+    loaded = [
+        name for name in results["import slackTools"][1]
+        if name.split('.')[0] in DEFERRED
+    ]
+    if loaded:
+        print(f"<!> `import slackTools` loaded deferred dependencies: {sorted(set(loaded))}")
+
+    elapsed_ms = (results["import slackTools"][0] - baseline) * 1e3
+    if max_ms is not None and (loaded or elapsed_ms > max_ms):
+        sys.exit(1)
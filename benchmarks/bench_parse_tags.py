@@ -0,0 +1,117 @@
+''' Benchmark: SlackTools.parse_tags against the original recursive re.sub implementation
+
+Usage: python benchmarks/bench_parse_tags.py [n_blocks] [repeat]
+No Slack key file or network access is required.
+'''
+# Standard Library
+import os
+import re
+import sys
+import copy
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from slackTools.slackTools import SlackTools
+from slackTools import keys
+
+
+USERS = {f"user{i}": f"<@U{i:08d}>" for i in range(200)}
+
+
+def legacy_parse_tags(self, blocks):
+    ''' Original implementation, kept for comparison '''
+    expr = r' @([^ ]*)'
+
+    def lookup(name):
+        if name in self.config['SLACK_USERS']:
+            return self.config['SLACK_USERS'][name]
+        return f" @{name}"
+
+    if isinstance(blocks, list):
+        for b in blocks:
+            legacy_parse_tags(self, b)
+
+    elif isinstance(blocks, dict):
+        if "text" in blocks.keys() and isinstance(blocks["text"], str):
+            blocks["text"] = re.sub(
+                expr,
+                lambda m: lookup(m.group(1)),
+                blocks["text"]
+            )
+            if self.hostname:
+                blocks["text"] = f"{self.hostname} :: {blocks['text']}"
+        for k in blocks.keys():
+            if isinstance(blocks[k], list) or isinstance(blocks[k], dict):
+                legacy_parse_tags(self, blocks[k])
+
+    elif isinstance(blocks, str):
+        return re.sub(expr, lambda m: lookup(m.group(1)), blocks)
+
+
+def make_instance():
+    ''' Bare SlackTools instance, bypassing the singleton and the key file '''
+    slack = object.__new__(SlackTools)
+    slack._config = keys.KeyConfig({'SLACK_USERS': USERS})
+    slack._config_checked = float('inf')     # Never reloaded
+    slack.filepath_slack_keys = str()
+    slack.hostname = "bench"
+    slack.verbose = False
+    slack.notify_init_del = False
+    slack._tag_resolver = None
+    return slack
+
+
+def make_payload(n_blocks):
+    ''' Block Kit table: sections with @tags, 10 fields each, and a button '''
+    blocks = []
+    for i in range(n_blocks):
+        blocks.append({
+            "type": "section",
+            "block_id": f"row{i}",
+            "text": {"type": "mrkdwn", "text": f"Row {i} owned by @user{i % 200} cc @nobody"},
+            "fields": [
+                {"type": "mrkdwn", "text": f"*epoch* {j} loss {0.1 * j:.3f} @user{j}"}
+                for j in range(10)
+            ],
+            "accessory": {
+                "type": "button",
+                "text": {"type": "plain_text", "text": "Open"},
+                "action_id": f"open{i}",
+                "url": "https://example.com",
+            },
+        })
+    return blocks
+
+
+def bench(fn, get_instance, payload, repeat):
+    copies = [copy.deepcopy(payload) for _ in range(repeat)]
+    times = []
+    for blocks in copies:
+        slack = get_instance()
+        t0 = time.perf_counter()
+        fn(slack, blocks)
+        times.append(time.perf_counter() - t0)
+    return min(times), sorted(times)[len(times) // 2]
+
+
+if __name__ == "__main__":
+    n_blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    payload = make_payload(n_blocks)
+
+    # Sanity check, both implementations must agree
+    a, b = copy.deepcopy(payload), copy.deepcopy(payload)
+    legacy_parse_tags(make_instance(), a)
+    SlackTools.parse_tags(make_instance(), b)
+    assert a == b, "parse_tags output differs from the original implementation"
+
+    # Cold: a fresh instance per run, warm: one instance reused across runs
+    slack = make_instance()
+    results = {
+        "legacy": bench(legacy_parse_tags, make_instance, payload, repeat),
+        "compiled (cold cache)": bench(SlackTools.parse_tags, make_instance, payload, repeat),
+        "compiled (warm cache)": bench(SlackTools.parse_tags, lambda: slack, payload, repeat),
+    }
+    print(f"parse_tags on {n_blocks} blocks ({repeat} runs)")
+    for name, (best, median) in results.items():
+        print(f"  {name:<24} best {best * 1e3:8.2f} ms   median {median * 1e3:8.2f} ms")
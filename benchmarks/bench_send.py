@@ -0,0 +1,217 @@
+''' Benchmark: throughput, latency and memory of the send paths, against a local mock Slack
+
+Usage: python benchmarks/bench_send.py [--messages N] [--latency S] [--rate-limit-ratio R]
+                                       [--reset-ratio R] [--json FILE]
+No Slack workspace or network access is required (see benchmarks/mock_slack.py).
+The mock runs in the same process, so at zero latency its CPU time is part of the results.
+Results can be saved with --json to compare two versions of the code.
+'''
+# Standard Library
+import os
+import sys
+import json
+import time
+import copy
+import argparse
+import tempfile
+import resource
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from mock_slack import MockSlack
+from bench_parse_tags import make_instance, make_payload
+import slackTools as sT
+from slackTools import blocks as sTblocks
+
+
+KEYS = '''
+[SLACK_BOT]
+TOKEN = "xoxb-benchmark"
+[SLACK_WEBHOOK]
+TOKEN = "{webhook}"
+[SLACK_CHANNEL]
+SLACK_DEFAULT_CHANNEL_ID = "C00000000"
+[SLACK_USERS]
+ian = "<@U00000001>"
+[SLACK_NOTIFICATION]
+NOTIFY_ON_EVENT = []
+'''
+
+
+def max_rss_mb()->float:
+    ''' Peak resident memory of the process (Linux reports KB, macOS bytes) '''
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1 << 20) if sys.platform == 'darwin' else rss / (1 << 10)
+
+
+def percentile(values:list, q:float)->float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.
+
+
+def run(name:str, fn, n:int)->dict:
+    ''' Calls fn(records) (which must perform n operations), then reports on the
+    per-operation durations it appended to records
+    '''
+    records = []
+    rss = max_rss_mb()
+    t0 = time.perf_counter()
+    fn(records)
+    elapsed = time.perf_counter() - t0
+    result = {
+        "name": name,
+        "operations": n,
+        "per_second": n / elapsed,
+        "p50_ms": percentile(records, .5) * 1e3,
+        "p99_ms": percentile(records, .99) * 1e3,
+        "peak_rss_growth_mb": max_rss_mb() - rss,
+    }
+    print(f"  {name:<34} {result['per_second']:10.1f}/s   p50 {result['p50_ms']:8.2f} ms" \
+        + f"   p99 {result['p99_ms']:8.2f} ms   peak RSS +{result['peak_rss_growth_mb']:.1f} MB")
+    return result
+
+
+def timed(fn, records:list):
+    t0 = time.perf_counter()
+    fn()
+    records.append(time.perf_counter() - t0)
+
+
+def keys_file(directory:str, mock:MockSlack, name:str)->str:
+    ''' Keys file pointing to the mock, one per client so that instances are not shared '''
+    filepath = os.path.join(directory, f"{name}.slack.key.toml")
+    with open(filepath, 'w') as file:
+        file.write(KEYS.format(webhook=mock.webhook_url(name)))
+    return filepath
+
+
+def build_blocks(i:int)->list:
+    ''' Typical notification built with the blocks helpers '''
+    blocks = []
+    sTblocks.add_header(f"Run {i} finished", blocks=blocks)
+    sTblocks.add_section(f"*loss* {0.01 * i:.3f} @ian", blocks=blocks)
+    sTblocks.add_divider(blocks=blocks)
+    sTblocks.add_context(blocks=blocks, elements=sTblocks.addObject_text("epoch 100", objs=[]))
+    return blocks
+
+
+def build_objects(i:int)->list:
+    ''' Same notification as build_blocks, with the Block Kit object model '''
+    return [
+        sTblocks.Header(f"Run {i} finished"),
+        sTblocks.Section(f"*loss* {0.01 * i:.3f} @ian"),
+        sTblocks.Divider(),
+        sTblocks.Context(["epoch 100"]),
+    ]
+
+
+def build_template()->sTblocks.Template:
+    ''' Same notification as build_blocks, compiled once '''
+    blocks = []
+    sTblocks.add_header("Run {i} finished", blocks=blocks)
+    sTblocks.add_section("*loss* {loss:.3f} @ian", blocks=blocks)
+    sTblocks.add_divider(blocks=blocks)
+    sTblocks.add_context(blocks=blocks, elements=sTblocks.addObject_text("epoch 100", objs=[]))
+    return sTblocks.Template(blocks)
+
+
+def main(args):
+    n = args.messages
+    results = []
+    print(f"{n} operations, latency {args.latency * 1e3:.0f} ms, " \
+        + f"429 ratio {args.rate_limit_ratio}, reset ratio {args.reset_ratio}")
+
+    # CPU only
+    payload = make_payload(50)
+    slack = make_instance()
+    results.append(run("parse_tags (50 blocks)", lambda records: [
+        timed(lambda: slack.parse_tags(copy.deepcopy(payload)), records) for _ in range(n)], n))
+    results.append(run("blocks builders", lambda records: [
+        timed(lambda: build_blocks(i), records) for i in range(n)], n))
+    results.append(run("blocks objects (+ to_dict)", lambda records: [
+        timed(lambda: [block.to_dict() for block in build_objects(i)], records) for i in range(n)], n))
+    template = build_template()
+    results.append(run("blocks template", lambda records: [
+        timed(lambda: template.render(i=i, loss=0.01 * i), records) for i in range(n)], n))
+
+    with MockSlack(
+            latency=args.latency,
+            rate_limit_ratio=args.rate_limit_ratio,
+            retry_after=args.retry_after,
+            reset_ratio=args.reset_ratio,
+            seed=args.seed
+        ) as mock, tempfile.TemporaryDirectory() as directory:
+
+        def client(cls, name:str, **kwargs):
+            instance = cls(
+                keys_file(directory, mock, name), notify_init_del=False, metrics=True, **kwargs)
+            if isinstance(instance, sT.SlackTools_bot):
+                instance.client.base_url = mock.api_url
+            return instance
+
+        def blocking(instance):
+            def fn(records):
+                for i in range(n):
+                    timed(lambda: instance.send_block(build_blocks(i), text=f"Run {i}"), records)
+            return fn
+
+        def non_blocking(instance):
+            # Latency from the call to delivery (queue wait included), from the metrics hook
+            def fn(records):
+                hook = instance.metrics
+                instance.metrics = lambda record: \
+                    records.append(record["queue_wait"] + record["seconds"]) or hook(record)
+                for i in range(n):
+                    instance.send_block(build_blocks(i), text=f"Run {i}")
+                instance.flush()
+                instance.metrics = hook
+            return fn
+
+        webhook = client(sT.SlackTools_webhook, "webhook")
+        results.append(run("SlackTools_webhook", blocking(webhook), n))
+        webhook_queued = client(sT.SlackTools_webhook, "webhook_queued", non_blocking=True)
+        results.append(run("SlackTools_webhook (non_blocking)", non_blocking(webhook_queued), n))
+
+        bot = client(sT.SlackTools_bot, "bot")
+        results.append(run("SlackTools_bot", blocking(bot), n))
+        bot_queued = client(sT.SlackTools_bot, "bot_queued", non_blocking=True)
+        results.append(run("SlackTools_bot (non_blocking)", non_blocking(bot_queued), n))
+
+        channels = [f"C{i:08d}" for i in range(n)]
+        # Latency of the whole broadcast
+        results.append(run(f"SlackTools_bot.broadcast ({n} channels)", lambda records: timed(
+            lambda: bot.broadcast(build_blocks(0), text="Alert", channels=channels), records), n))
+
+        filepath = os.path.join(directory, "upload.bin")
+        with open(filepath, 'wb') as file:
+            file.write(os.urandom(args.file_size))
+        n_files = max(1, n // 10)
+        results.append(run(f"SlackTools_bot.send_file ({args.file_size >> 10} KB)",
+            lambda records: [timed(lambda: bot.send_file(filepath), records)
+                for _ in range(n_files)], n_files))
+
+        errors = sum(
+            value for instance in (webhook, webhook_queued, bot, bot_queued)
+            for key, value in instance.metrics.summary().items()
+            if key.startswith('slack_sends_total') and 'outcome="error"' in key)
+        print(f"  {sum(mock.requests.values())} requests served, {errors} failed sends")
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump({"arguments": vars(args), "results": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--messages', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.,
+        help="seconds waited by the mock before each answer")
+    parser.add_argument('--rate-limit-ratio', type=float, default=0.,
+        help="fraction of requests answered with 429")
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--reset-ratio', type=float, default=0.,
+        help="fraction of connections reset by the mock")
+    parser.add_argument('--file-size', type=int, default=1 << 20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="file to save the results to")
+    main(parser.parse_args())
@@ -0,0 +1,180 @@
+''' Local stand-in for the Slack Web API and incoming webhooks, for offline benchmarks
+
+Serves chat.postMessage, chat.update, files.getUploadURLExternal,
+files.completeUploadExternal, the upload URLs and incoming webhooks (/hook/<name>),
+with configurable latency, rate limiting (429) and connection resets.
+
+Usage: python benchmarks/mock_slack.py [port]   (serves until interrupted)
+'''
+# Standard Library
+import json
+import time
+import random
+import socket
+import struct
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class _Server(ThreadingHTTPServer):
+    # Concurrent clients must not stall on a full listen backlog (default 5)
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class MockSlack:
+    ''' Mock Slack server running in a background thread
+    var latency:float = seconds waited before answering each request,
+    var rate_limit_ratio:float = fraction of requests answered with 429,
+    var retry_after:int = Retry-After (seconds) of 429 responses,
+    var reset_ratio:float = fraction of connections reset without an answer,
+    var seed:int = seed of the random failures, for reproducible runs,
+    var port:int = port to listen on, 0 picks a free one
+    '''
+
+    def __init__(
+            self,
+            latency:float=0.,
+            rate_limit_ratio:float=0.,
+            retry_after:int=1,
+            reset_ratio:float=0.,
+            seed:int=0,
+            port:int=0
+        ):
+        self.latency = latency
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self.reset_ratio = reset_ratio
+        self.random = random.Random(seed)
+        self.requests = {}
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+        self._file_ids = 0
+
+        self.server = _Server(('127.0.0.1', port), self._handler())
+        self.port = self.server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+    def start(self):
+        self._thread.start()
+        return self
+
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+    @property
+    def api_url(self)->str:
+        ''' base_url for WebClient '''
+        return f"{self.url}/api/"
+
+
+    def webhook_url(self, name:str="default")->str:
+        return f"{self.url}/hook/{name}"
+
+
+    def _outcome(self, path:str)->str:
+        ''' Counts the request and draws its outcome: 'ok', 'rate_limited' or 'reset' '''
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+            draw = self.random.random()
+        if draw < self.reset_ratio:
+            return 'reset'
+        if draw < self.reset_ratio + self.rate_limit_ratio:
+            return 'rate_limited'
+        return 'ok'
+
+
+    def _api_response(self, method:str)->dict:
+        if method == "files.getUploadURLExternal":
+            with self._lock:
+                self._file_ids += 1
+                file_id = f"F{self._file_ids:08d}"
+            return {"ok": True, "upload_url": f"{self.url}/upload/{file_id}", "file_id": file_id}
+        if method == "files.completeUploadExternal":
+            return {"ok": True, "files": [{"id": "F00000000"}]}
+        return {"ok": True, "channel": "C00000000", "ts": f"{time.time():.6f}"}
+
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately, avoid waiting for delayed ACKs
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                # Read and discard the body
+                length = int(self.headers.get('Content-Length', 0))
+                upload = self.path.startswith('/upload/')
+                left = length
+                while left > 0:
+                    chunk = self.rfile.read(min(left, 1 << 16))
+                    if not chunk:
+                        break
+                    left -= len(chunk)
+                with mock._lock:
+                    mock.bytes_received += length
+
+                outcome = mock._outcome(self.path.split('?')[0])
+                if mock.latency:
+                    time.sleep(mock.latency)
+
+                if outcome == 'reset':
+                    # RST instead of FIN
+                    self.connection.setsockopt(
+                        socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+                    self.close_connection = True
+                    self.connection.close()
+                    return
+
+                status = 429 if outcome == 'rate_limited' else 200
+                if self.path.startswith('/hook/'):
+                    content_type = 'text/plain'
+                    out = b'ok' if status == 200 else b'rate_limited'
+                elif upload:
+                    content_type = 'text/plain'
+                    out = b'OK'
+                else:
+                    content_type = 'application/json'
+                    method = self.path.split('?')[0].rsplit('/', 1)[-1]
+                    response = mock._api_response(method) if status == 200 else \
+                        {"ok": False, "error": "ratelimited"}
+                    out = json.dumps(response).encode('utf-8')
+
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(out)))
+                if status == 429:
+                    self.send_header('Retry-After', str(mock.retry_after))
+                self.end_headers()
+                self.wfile.write(out)
+
+        return Handler
+
+
+# TESTING
+if __name__ == "__main__":
+    import sys
+    mock = MockSlack(port=int(sys.argv[1]) if len(sys.argv) > 1 else 0).start()
+    print(f"Mock Slack listening on {mock.url} (API: {mock.api_url}, webhooks: {mock.url}/hook/<name>)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        mock.stop()
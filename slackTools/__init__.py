@@ -1,2 +1,29 @@
-from .slackTools_webhook import SlackTools_webhook
-from .slackTools_bot import SlackTools_bot
+# Clients are imported on first access, so that `import slackTools` stays fast
+# and aiohttp is only needed by the asyncio variants.
+_clients = {
+    'SlackTools_webhook': '.slackTools_webhook',
+    'SlackTools_bot': '.slackTools_bot',
+    'AsyncSlackTools_webhook': '.slackTools_webhook_async',
+    'AsyncSlackTools_bot': '.slackTools_bot_async',
+}
+
+# The asyncio variants are only exported by `import *` when aiohttp is installed
+__all__ = ['SlackTools_webhook', 'SlackTools_bot']
+def _aiohttp_installed()->bool:
+    import importlib.util
+    return importlib.util.find_spec('aiohttp') is not None
+if _aiohttp_installed():
+    __all__ += ['AsyncSlackTools_webhook', 'AsyncSlackTools_bot']
+
+
+def __getattr__(name):
+    if name in _clients:
+        import importlib
+        value = getattr(importlib.import_module(_clients[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,9 +1,12 @@
 from .views import *
 from .elements import *
 from .composition import *
+from .model import *
+from .template import Template
+from .table import Table, add_table
 
 
-def add_action(elements, blocks:list=[], block_id=None):
+def add_action(elements, blocks:list=None, block_id=None):
     ''' See https://api.slack.com/reference/block-kit/blocks#actions'''
     block = (
         {
@@ -17,11 +20,13 @@ def add_action(elements, blocks:list=[], block_id=None):
                 "block_id": block_id
             }
         )
+    if blocks is None:
+        blocks = []
     blocks.append(block)
     return blocks
 
 
-def add_context(blocks:list=[], block_id=None, elements=None):
+def add_context(blocks:list=None, block_id=None, elements=None):
     ''' See https://api.slack.com/reference/block-kit/blocks#context '''
     block = (
         {
@@ -41,11 +46,13 @@ def add_context(blocks:list=[], block_id=None, elements=None):
                 "elements": elements
             }
         )
+    if blocks is None:
+        blocks = []
     blocks.append(block)
     return blocks
 
 
-def add_divider(blocks:list=[], block_id=None):
+def add_divider(blocks:list=None, block_id=None):
     ''' See https://api.slack.com/reference/block-kit/blocks#divider '''
     block = (
         {
@@ -58,11 +65,13 @@ def add_divider(blocks:list=[], block_id=None):
                 "block_id": block_id
             }
         )
+    if blocks is None:
+        blocks = []
     blocks.append(block)
     return blocks
 
 
-def add_header(message, blocks:list=[], block_id=None):
+def add_header(message, blocks:list=None, block_id=None):
     ''' See https://api.slack.com/reference/block-kit/blocks#header '''
     block = (
         {
@@ -80,11 +89,13 @@ def add_header(message, blocks:list=[], block_id=None):
                 "block_id": block_id
             }
         )
+    if blocks is None:
+        blocks = []
     blocks.append(block)
     return blocks
 
 
-def add_input(element, label=" ", blocks:list=[], block_id=None, isDispatch=False, isOptional=False, hint=None):
+def add_input(element, label=" ", blocks:list=None, block_id=None, isDispatch=False, isOptional=False, hint=None):
     ''' See https://api.slack.com/reference/block-kit/blocks#input '''
     block = (
         {
@@ -114,11 +125,13 @@ def add_input(element, label=" ", blocks:list=[], block_id=None, isDispatch=Fals
                 }
             }
         )
+    if blocks is None:
+        blocks = []
     blocks.append(block)
     return blocks
 
 
-def add_section(text, blocks:list=[], block_id=None, fields=None, accessory=None):
+def add_section(text, blocks:list=None, block_id=None, fields=None, accessory=None):
     ''' See https://api.slack.com/reference/block-kit/blocks#section'''
     block = (
         {
@@ -150,5 +163,7 @@ def add_section(text, blocks:list=[], block_id=None, fields=None, accessory=None
                 "accessory": accessory
             }
         )
+    if blocks is None:
+        blocks = []
     blocks.append(block)
     return blocks
@@ -1,4 +1,4 @@
-def addObject_confirmDialogue(title, text, confirm, deny, objs=[], style=None):
+def addObject_confirmDialogue(title, text, confirm, deny, objs=None, style=None):
     ''' See https://api.slack.com/reference/block-kit/composition-objects#confirm '''
     obj = (
         {
@@ -29,11 +29,13 @@ def addObject_confirmDialogue(title, text, confirm, deny, objs=[], style=None):
                 "style": style
             }
         )
+    if objs is None:
+        objs = []
     objs.append(obj)
     return objs
 
 
-def addObject_text(text, type="mrkdwn", objs=[]):
+def addObject_text(text, type="mrkdwn", objs=None):
     ''' See https://api.slack.com/reference/block-kit/composition-objects#text'''
     obj = (
         {
@@ -47,5 +49,7 @@ def addObject_text(text, type="mrkdwn", objs=[]):
                 "emoji": True
             }
         )
+    if objs is None:
+        objs = []
     objs.append(obj)
     return objs
@@ -1,4 +1,4 @@
-def addElement_button(text, action_id, elements=[], url=None, value=None, style=None, confirm=None):
+def addElement_button(text, action_id, elements=None, url=None, value=None, style=None, confirm=None):
     ''' See https://api.slack.com/reference/block-kit/block-elements#button '''
     element = (
         {
@@ -35,11 +35,13 @@ def addElement_button(text, action_id, elements=[], url=None, value=None, style=
                 "confirm": confirm
             }
         )
+    if elements is None:
+        elements = []
     elements.append(element)
     return elements
 
 
-def addElement_checkboxes(options, action_id, options_initial=None, elements=[], url=None, value=None, style=None, confirm=None, focus_on_load=False):
+def addElement_checkboxes(options, action_id, options_initial=None, elements=None, url=None, value=None, style=None, confirm=None, focus_on_load=False):
     ''' See https://api.slack.com/reference/block-kit/block-elements#checkboxes '''
     element = (
         {
@@ -74,11 +76,13 @@ def addElement_checkboxes(options, action_id, options_initial=None, elements=[],
                 "confirm": confirm
             }
         )
+    if elements is None:
+        elements = []
     elements.append(element)
     return elements
 
 
-def addElement_image(image_url, alt_text, elements=[]):
+def addElement_image(image_url, alt_text, elements=None):
     ''' See https://api.slack.com/reference/block-kit/block-elements#image '''
     element = (
         {
@@ -87,11 +91,13 @@ def addElement_image(image_url, alt_text, elements=[]):
             "alt_text": alt_text
         }
     )
+    if elements is None:
+        elements = []
     elements.append(element)
     return elements
 
 
-def addElement_input_plainText(action_id, elements=[], initial_value=None, multiline=False, min_length=None, max_length=None, dispatch_action_config=None, focus_on_load=False, placeholder=None):
+def addElement_input_plainText(action_id, elements=None, initial_value=None, multiline=False, min_length=None, max_length=None, dispatch_action_config=None, focus_on_load=False, placeholder=None):
     ''' See https://api.slack.com/reference/block-kit/block-elements#input '''
     element = (
         {
@@ -131,11 +137,13 @@ def addElement_input_plainText(action_id, elements=[], initial_value=None, multi
                 "placeholder": placeholder
             }
         )
+    if elements is None:
+        elements = []
     elements.append(element)
     return elements
 
 
-def addElement_input_url(action_id, elements=[], initial_value=None, placeholder=None, focus_on_load=False, dispatch_action_config=None):
+def addElement_input_url(action_id, elements=None, initial_value=None, placeholder=None, focus_on_load=False, dispatch_action_config=None):
     ''' See https://api.slack.com/reference/block-kit/block-elements#url '''
     element = (
         {
@@ -162,5 +170,7 @@ def addElement_input_url(action_id, elements=[], initial_value=None, placeholder
                 "placeholder": placeholder
             }
         )
+    if elements is None:
+        elements = []
     elements.append(element)
     return elements
@@ -0,0 +1,352 @@
+''' Block Kit object model
+Compact alternative to the add_* helpers: objects are validated against Slack's
+limits when created, and only serialized to dicts when sent, in a single pass that
+also resolves @name tags (see SlackTools.parse_tags). Plain strings are accepted
+wherever a text object is expected.
+
+    blocks = [
+        Header("Run 42 finished"),
+        Section("*loss* 0.123 @ian", fields=["*epoch*", "100"]),
+        Actions([Button("Open", "open", url="https://example.com")]),
+    ]
+    slack.send_block(blocks, text="Run 42 finished")
+'''
+
+
+def _check(value, limit:int, name:str):
+    ''' Raises if value (a string, text object or list) is longer than limit '''
+    if value is not None and len(value) > limit:
+        raise ValueError(f"<!> {name} is limited to {limit}, got {len(value)}.")
+
+
+def _check_style(style):
+    if style not in (None, "primary", "danger"):
+        raise ValueError(f"<!> Unknown style {style}. Please use 'primary' or 'danger'.")
+
+
+def _serialize(value, text):
+    if isinstance(value, BlockObject):
+        return value.to_dict(text)
+    if isinstance(value, list):
+        return [_serialize(item, text) for item in value]
+    return value
+
+
+class BlockObject:
+    ''' Base of the Block Kit objects
+    FIELDS lists the (attribute, key) pairs serialized, in order, None values are omitted
+    '''
+    __slots__ = ()
+    TYPE = None
+    FIELDS = ()
+
+    def to_dict(self, text=None)->dict:
+        ''' Serializes the object and its children
+        var text = callable(str)->str applied to the text of every text object (e.g. tag resolution)
+        '''
+        obj = {"type": self.TYPE} if self.TYPE else {}
+        for attribute, key in self.FIELDS:
+            value = getattr(self, attribute)
+            if value is not None:
+                obj[key] = _serialize(value, text)
+        return obj
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.to_dict()})"
+
+
+# Composition objects
+# See https://api.slack.com/reference/block-kit/composition-objects
+
+class Text(BlockObject):
+    ''' mrkdwn (default) or plain_text text object '''
+    __slots__ = ('text', 'mrkdwn', 'emoji')
+
+    def __init__(self, text:str, mrkdwn:bool=True, emoji:bool=True):
+        self.text = text
+        self.mrkdwn = mrkdwn
+        self.emoji = emoji
+
+    def __len__(self):
+        return len(self.text)
+
+    def to_dict(self, text=None)->dict:
+        value = self.text if text is None else text(self.text)
+        if self.mrkdwn:
+            return {"type": "mrkdwn", "text": value}
+        return {"type": "plain_text", "text": value, "emoji": self.emoji}
+
+
+def _text(value, mrkdwn:bool=True):
+    ''' Text object from a string (or None), text objects are kept '''
+    if value is None or isinstance(value, Text):
+        return value
+    return Text(value, mrkdwn=mrkdwn)
+
+
+class Confirm(BlockObject):
+    ''' Confirmation dialog '''
+    __slots__ = ('title', 'text', 'confirm', 'deny', 'style')
+    FIELDS = (('title', 'title'), ('text', 'text'), ('confirm', 'confirm'), ('deny', 'deny'),
+        ('style', 'style'))
+
+    def __init__(self, title:str, text:str, confirm:str, deny:str, style:str=None):
+        self.title = _text(title, mrkdwn=False)
+        self.text = _text(text)
+        self.confirm = _text(confirm, mrkdwn=False)
+        self.deny = _text(deny, mrkdwn=False)
+        self.style = style
+        _check(self.title, 100, "Confirm title")
+        _check(self.text, 300, "Confirm text")
+        _check(self.confirm, 30, "Confirm button")
+        _check(self.deny, 30, "Deny button")
+        _check_style(style)
+
+
+class Option(BlockObject):
+    ''' Option of checkboxes and menus '''
+    __slots__ = ('text', 'value', 'description')
+    FIELDS = (('text', 'text'), ('value', 'value'), ('description', 'description'))
+
+    def __init__(self, text:str, value:str, description:str=None):
+        self.text = _text(text, mrkdwn=False)
+        self.value = value
+        self.description = _text(description, mrkdwn=False)
+        _check(self.text, 75, "Option text")
+        _check(value, 150, "Option value")
+        _check(self.description, 75, "Option description")
+
+
+# Block elements
+# See https://api.slack.com/reference/block-kit/block-elements
+
+class Button(BlockObject):
+    __slots__ = ('text', 'action_id', 'url', 'value', 'style', 'confirm')
+    TYPE = "button"
+    FIELDS = (('text', 'text'), ('action_id', 'action_id'), ('value', 'value'), ('url', 'url'),
+        ('style', 'style'), ('confirm', 'confirm'))
+
+    def __init__(self, text:str, action_id:str, url:str=None, value:str=None, style:str=None,
+            confirm:Confirm=None):
+        self.text = _text(text, mrkdwn=False)
+        self.action_id = action_id
+        self.url = url
+        self.value = value
+        self.style = style
+        self.confirm = confirm
+        _check(self.text, 75, "Button text")
+        _check(action_id, 255, "action_id")
+        _check(url, 3000, "Button url")
+        _check(value, 2000, "Button value")
+        _check_style(style)
+
+
+class Checkboxes(BlockObject):
+    __slots__ = ('options', 'action_id', 'initial_options', 'confirm', 'focus_on_load')
+    TYPE = "checkboxes"
+    FIELDS = (('options', 'options'), ('action_id', 'action_id'),
+        ('focus_on_load', 'focus_on_load'), ('initial_options', 'initial_options'),
+        ('confirm', 'confirm'))
+
+    def __init__(self, options:list, action_id:str, initial_options:list=None,
+            confirm:Confirm=None, focus_on_load:bool=False):
+        self.options = options
+        self.action_id = action_id
+        self.initial_options = initial_options
+        self.confirm = confirm
+        self.focus_on_load = focus_on_load
+        _check(options, 10, "Checkboxes options")
+        _check(action_id, 255, "action_id")
+
+
+class Image(BlockObject):
+    ''' Image element, for context blocks and section accessories '''
+    __slots__ = ('image_url', 'alt_text')
+    TYPE = "image"
+    FIELDS = (('image_url', 'image_url'), ('alt_text', 'alt_text'))
+
+    def __init__(self, image_url:str, alt_text:str):
+        self.image_url = image_url
+        self.alt_text = alt_text
+        _check(image_url, 3000, "Image url")
+        _check(alt_text, 2000, "Image alt_text")
+
+
+class PlainTextInput(BlockObject):
+    __slots__ = ('action_id', 'initial_value', 'multiline', 'min_length', 'max_length',
+        'dispatch_action_config', 'focus_on_load', 'placeholder')
+    TYPE = "plain_text_input"
+    FIELDS = (('action_id', 'action_id'), ('focus_on_load', 'focus_on_load'),
+        ('multiline', 'multiline'), ('initial_value', 'initial_value'),
+        ('min_length', 'min_length'), ('max_length', 'max_length'),
+        ('dispatch_action_config', 'dispatch_action_config'), ('placeholder', 'placeholder'))
+
+    def __init__(self, action_id:str, initial_value:str=None, multiline:bool=False,
+            min_length:int=None, max_length:int=None, dispatch_action_config:dict=None,
+            focus_on_load:bool=False, placeholder:str=None):
+        self.action_id = action_id
+        self.initial_value = initial_value
+        self.multiline = multiline
+        self.min_length = min_length
+        self.max_length = max_length
+        self.dispatch_action_config = dispatch_action_config
+        self.focus_on_load = focus_on_load
+        self.placeholder = _text(placeholder, mrkdwn=False)
+        _check(action_id, 255, "action_id")
+        _check(self.placeholder, 150, "Input placeholder")
+        if max_length is not None and max_length > 3000:
+            raise ValueError(f"<!> Input max_length is limited to 3000, got {max_length}.")
+
+
+class UrlInput(BlockObject):
+    __slots__ = ('action_id', 'initial_value', 'placeholder', 'focus_on_load',
+        'dispatch_action_config')
+    TYPE = "url_text_input"
+    FIELDS = (('action_id', 'action_id'), ('focus_on_load', 'focus_on_load'),
+        ('initial_value', 'initial_value'), ('dispatch_action_config', 'dispatch_action_config'),
+        ('placeholder', 'placeholder'))
+
+    def __init__(self, action_id:str, initial_value:str=None, placeholder:str=None,
+            focus_on_load:bool=False, dispatch_action_config:dict=None):
+        self.action_id = action_id
+        self.initial_value = initial_value
+        self.placeholder = _text(placeholder, mrkdwn=False)
+        self.focus_on_load = focus_on_load
+        self.dispatch_action_config = dispatch_action_config
+        _check(action_id, 255, "action_id")
+        _check(self.placeholder, 150, "Input placeholder")
+
+
+# Blocks
+# See https://api.slack.com/reference/block-kit/blocks
+
+class Section(BlockObject):
+    __slots__ = ('text', 'fields', 'accessory', 'block_id')
+    TYPE = "section"
+    FIELDS = (('text', 'text'), ('block_id', 'block_id'), ('fields', 'fields'),
+        ('accessory', 'accessory'))
+
+    def __init__(self, text:str=None, fields:list=None, accessory:BlockObject=None,
+            block_id:str=None):
+        self.text = _text(text)
+        self.fields = None if fields is None else [_text(field) for field in fields]
+        self.accessory = accessory
+        self.block_id = block_id
+        if self.text is None and not self.fields:
+            raise ValueError("<!> A section needs a text or fields.")
+        _check(self.text, 3000, "Section text")
+        _check(self.fields, 10, "Section fields")
+        for field in self.fields or ():
+            _check(field, 2000, "Section field")
+        _check(block_id, 255, "block_id")
+
+
+class Header(BlockObject):
+    __slots__ = ('text', 'block_id')
+    TYPE = "header"
+    FIELDS = (('text', 'text'), ('block_id', 'block_id'))
+
+    def __init__(self, text:str, block_id:str=None):
+        self.text = _text(text, mrkdwn=False)
+        self.block_id = block_id
+        _check(self.text, 150, "Header text")
+        _check(block_id, 255, "block_id")
+
+
+class Divider(BlockObject):
+    __slots__ = ('block_id',)
+    TYPE = "divider"
+    FIELDS = (('block_id', 'block_id'),)
+
+    def __init__(self, block_id:str=None):
+        self.block_id = block_id
+        _check(block_id, 255, "block_id")
+
+
+class Context(BlockObject):
+    ''' Images and texts, strings are mrkdwn texts '''
+    __slots__ = ('elements', 'block_id')
+    TYPE = "context"
+    FIELDS = (('block_id', 'block_id'), ('elements', 'elements'))
+
+    def __init__(self, elements:list, block_id:str=None):
+        self.elements = [_text(element) if isinstance(element, str) else element
+            for element in elements]
+        self.block_id = block_id
+        _check(self.elements, 10, "Context elements")
+        _check(block_id, 255, "block_id")
+
+
+class Actions(BlockObject):
+    __slots__ = ('elements', 'block_id')
+    TYPE = "actions"
+    FIELDS = (('elements', 'elements'), ('block_id', 'block_id'))
+
+    def __init__(self, elements:list, block_id:str=None):
+        self.elements = elements
+        self.block_id = block_id
+        _check(elements, 25, "Actions elements")
+        _check(block_id, 255, "block_id")
+
+
+class Input(BlockObject):
+    __slots__ = ('element', 'label', 'hint', 'optional', 'dispatch_action', 'block_id')
+    TYPE = "input"
+    FIELDS = (('optional', 'optional'), ('dispatch_action', 'dispatch_action'),
+        ('element', 'element'), ('label', 'label'), ('block_id', 'block_id'), ('hint', 'hint'))
+
+    def __init__(self, element:BlockObject, label:str=" ", hint:str=None, optional:bool=False,
+            dispatch_action:bool=False, block_id:str=None):
+        self.element = element
+        self.label = _text(label, mrkdwn=False)
+        self.hint = _text(hint, mrkdwn=False)
+        self.optional = optional
+        self.dispatch_action = dispatch_action
+        self.block_id = block_id
+        _check(self.label, 2000, "Input label")
+        _check(self.hint, 2000, "Input hint")
+        _check(block_id, 255, "block_id")
+
+
+# Views
+# See https://api.slack.com/reference/surfaces/views
+
+class Home(BlockObject):
+    __slots__ = ('title', 'blocks', 'callback_id', 'private_metadata')
+    TYPE = "home"
+    FIELDS = (('title', 'title'), ('blocks', 'blocks'), ('callback_id', 'callback_id'),
+        ('private_metadata', 'private_metadata'))
+
+    def __init__(self, title:str, blocks:list=None, callback_id:str=None,
+            private_metadata:str=None):
+        self.title = _text(title, mrkdwn=False)
+        self.blocks = [] if blocks is None else blocks
+        self.callback_id = callback_id
+        self.private_metadata = private_metadata
+        _check(self.title, 24, "View title")
+        _check(self.blocks, 100, "View blocks")
+        _check(callback_id, 255, "callback_id")
+        _check(private_metadata, 3000, "private_metadata")
+
+
+class Modal(BlockObject):
+    __slots__ = ('title', 'blocks', 'submit', 'close', 'callback_id', 'private_metadata')
+    TYPE = "modal"
+    FIELDS = (('title', 'title'), ('close', 'close'), ('blocks', 'blocks'),
+        ('callback_id', 'callback_id'), ('private_metadata', 'private_metadata'),
+        ('submit', 'submit'))
+
+    def __init__(self, title:str, blocks:list=None, submit:str=None, close:str="Close",
+            callback_id:str=None, private_metadata:str=None):
+        self.title = _text(title, mrkdwn=False)
+        self.blocks = [] if blocks is None else blocks
+        self.submit = _text(submit, mrkdwn=False)
+        self.close = _text(close, mrkdwn=False)
+        self.callback_id = callback_id
+        self.private_metadata = private_metadata
+        _check(self.title, 24, "View title")
+        _check(self.submit, 24, "View submit")
+        _check(self.close, 24, "View close")
+        _check(self.blocks, 100, "View blocks")
+        _check(callback_id, 255, "callback_id")
+        _check(private_metadata, 3000, "private_metadata")
@@ -0,0 +1,197 @@
+# Standard Library
+import io
+import csv
+
+# Custom
+try:
+    from ..payloadGuard import MAX_SECTION_TEXT, MAX_HEADER_TEXT
+except ImportError:
+    from payloadGuard import MAX_SECTION_TEXT, MAX_HEADER_TEXT
+
+
+# Characters between two columns of a monospace table
+COLUMN_SEPARATOR = "  "
+
+# Fields per section and characters per field
+# See https://api.slack.com/reference/block-kit/blocks#section_fields
+MAX_FIELDS = 10
+MAX_FIELD_TEXT = 2000
+
+
+def _columns(data, columns:list=None)->tuple:
+    ''' Returns the column names and the columns (sequences or arrays) of a table given as
+    a pandas DataFrame, a dict of columns, a 1D/2D NumPy array or a list of rows
+    '''
+    if hasattr(data, 'iloc') and hasattr(data, 'columns'):
+        # pandas DataFrame, without importing pandas
+        names = [str(name) for name in data.columns]
+        values = [data.iloc[:, j].to_numpy() for j in range(len(names))]
+    elif isinstance(data, dict):
+        names = [str(name) for name in data]
+        values = list(data.values())
+    elif getattr(data, 'ndim', None) == 1:
+        names = ["0"]
+        values = [data]
+    elif getattr(data, 'ndim', None) == 2:
+        names = [str(j) for j in range(data.shape[1])]
+        values = [data[:, j] for j in range(data.shape[1])]
+    elif getattr(data, 'ndim', None) is not None:
+        raise ValueError(f"<!> Tables must have 1 or 2 dimensions, got {data.ndim}.")
+    else:
+        rows = list(data)
+        names = [str(j) for j in range(len(rows[0]) if rows else 0)]
+        values = [list(column) for column in zip(*rows)]
+
+    if columns is not None:
+        if len(columns) != len(values):
+            raise ValueError(f"<!> {len(columns)} column names given for {len(values)} columns.")
+        names = [str(name) for name in columns]
+    lengths = {len(column) for column in values}
+    if len(lengths) > 1:
+        raise ValueError(f"<!> Columns of a table must have the same length, got {sorted(lengths)}.")
+    return names, values
+
+
+def format_column(values, float_format:str='.4g')->tuple:
+    ''' Formats a column once, with a single map over its values
+    NumPy arrays are converted to Python scalars with tolist() and formatted by their dtype.
+    Returns (cells:list, numeric:bool), numeric columns are right-aligned
+    '''
+    kind = getattr(getattr(values, 'dtype', None), 'kind', None)
+    if hasattr(values, 'tolist'):
+        values = values.tolist()
+    format_float = f"{{:{float_format}}}".format
+    if kind == 'f':
+        return list(map(format_float, values)), True
+    if kind in ('i', 'u'):
+        return list(map(str, values)), True
+    if kind == 'b':
+        return list(map(str, values)), False
+
+    # Lists and object arrays
+    numeric = all(isinstance(value, (int, float)) and not isinstance(value, bool)
+        for value in values)
+    return [format_float(value) if isinstance(value, float) else str(value)
+        for value in values], numeric and len(values) > 0
+
+
+class Table:
+    ''' Table formatted once, then rendered as blocks or CSV
+    var data = pandas DataFrame, dict of columns, 1D/2D NumPy array or list of rows,
+    var columns:list = column names, replacing those of data,
+    var float_format:str = format spec of floating point numbers (e.g. '.3f')
+    '''
+
+    def __init__(self, data, columns:list=None, float_format:str='.4g'):
+        self.names, self.values = _columns(data, columns)
+        formatted = [format_column(column, float_format) for column in self.values]
+        self.cells = [cells for cells, _ in formatted]
+        self.numeric = [numeric for _, numeric in formatted]
+        self.rows = len(self.cells[0]) if self.cells else 0
+        self.widths = [
+            max(len(name), max(map(len, cells), default=0))
+            for name, cells in zip(self.names, self.cells)
+        ]
+
+
+    def line_width(self)->int:
+        ''' Characters of one line of the monospace table '''
+        return sum(self.widths) + len(COLUMN_SEPARATOR) * max(0, len(self.widths) - 1)
+
+
+    def text_size(self)->int:
+        ''' Characters of the monospace table, without building it '''
+        return (self.rows + 1) * (self.line_width() + 1)
+
+
+    def _line(self, cells)->str:
+        return COLUMN_SEPARATOR.join(
+            cell.rjust(width) if numeric else cell.ljust(width)
+            for cell, width, numeric in zip(cells, self.widths, self.numeric)
+        ).rstrip()
+
+
+    def blocks(self, title:str=str(), layout:str='code')->list:
+        ''' Renders the table as blocks, in as many sections as needed
+        var title:str = optional header block,
+        var layout:str = 'code' for monospace code blocks (any number of columns),
+            'fields' for section fields (two columns, e.g. name and value)
+        '''
+        blocks = []
+        if title:
+            blocks.append({"type": "header", "text": {
+                "type": "plain_text", "text": title[:MAX_HEADER_TEXT], "emoji": True}})
+        if layout == 'code':
+            blocks.extend(self._code_blocks())
+        elif layout == 'fields':
+            blocks.extend(self._field_blocks())
+        else:
+            raise ValueError(f"<!> Unknown table layout {layout}. Please use 'code' or 'fields'.")
+        return blocks
+
+
+    def _code_blocks(self)->list:
+        ''' Monospace sections, each repeating the column names, within MAX_SECTION_TEXT '''
+        header = self._line(self.names)
+        budget = MAX_SECTION_TEXT - len("```\n\n```") - len(header) - 1
+        width = self.line_width()
+        if width > budget:
+            # Lines too wide for a section are cut
+            width = budget
+        per_block = max(1, budget // (width + 1))
+
+        blocks = []
+        rows = list(zip(*self.cells))
+        for start in range(0, max(1, len(rows)), per_block):
+            lines = [header]
+            lines.extend(self._line(row)[:width] for row in rows[start:start + per_block])
+            blocks.append({"type": "section", "text": {
+                "type": "mrkdwn", "text": "```\n" + "\n".join(lines) + "\n```"}})
+        return blocks
+
+
+    def _field_blocks(self)->list:
+        ''' Sections of up to MAX_FIELDS fields, the column names first '''
+        if len(self.cells) != 2:
+            raise ValueError(f"<!> The 'fields' layout needs 2 columns, got {len(self.cells)}.")
+        fields = [f"*{name}*" for name in self.names]
+        for key, value in zip(*self.cells):
+            fields.append(key)
+            fields.append(value)
+
+        return [
+            {"type": "section", "fields": [
+                {"type": "mrkdwn", "text": field[:MAX_FIELD_TEXT]}
+                for field in fields[start:start + MAX_FIELDS]
+            ]}
+            for start in range(0, len(fields), MAX_FIELDS)
+        ]
+
+
+    def csv(self)->bytes:
+        ''' Full precision CSV of the table (from the values, not their formatting) '''
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.names)
+        writer.writerows(zip(*[
+            column.tolist() if hasattr(column, 'tolist') else column for column in self.values]))
+        return buffer.getvalue().encode('utf-8')
+
+
+def add_table(
+        data,
+        blocks:list=None,
+        title:str=str(),
+        columns:list=None,
+        float_format:str='.4g',
+        layout:str='code'
+    ):
+    ''' Formats a table (pandas DataFrame, dict of columns, NumPy array or list of rows)
+    as blocks, see Table.blocks. Long tables take several sections; messages with too
+    many blocks are split when sent, see SlackTools.send_table for a CSV fallback.
+    '''
+    table = Table(data, columns=columns, float_format=float_format)
+    if blocks is None:
+        blocks = []
+    blocks.extend(table.blocks(title=title, layout=layout))
+    return blocks
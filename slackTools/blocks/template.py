@@ -0,0 +1,143 @@
+# Standard Library
+import re
+import json
+
+
+# {name} or {name:format_spec}, as with str.format
+SLOT = re.compile(r'\{([A-Za-z_][A-Za-z0-9_]*)(?::([^{}"\\]*))?\}')
+
+# In serialized layouts, a string made of a single slot may be replaced by any JSON value
+JSON_SLOT = re.compile(r'"\{([A-Za-z_][A-Za-z0-9_]*)\}"|' + SLOT.pattern)
+
+
+class Template:
+    ''' Block Kit layout compiled once, then rendered by filling its slots
+    Slots are written {name} or {name:format_spec} in any string of the layout,
+    e.g. add_section("*loss* {loss:.3f}"). A string made of a single {name} slot
+    can also be filled with a list or dict (e.g. section fields).
+    Rendering only builds the objects containing slots or text, the other static
+    parts of the layout are shared between renders: texts are rewritten in place when
+    sent (@mentions, hostname), everything else must not be modified.
+
+    var blocks:list = layout, e.g. built with the blocks helpers
+    Usage:
+        card = Template(add_section("*loss* {loss:.3f} @ian", blocks=add_header("Epoch {epoch}")))
+        slack.send_block(card.render(epoch=epoch, loss=loss), text=f"Epoch {epoch}")
+    '''
+
+    def __init__(self, blocks:list):
+        self.blocks = blocks
+        self._slots = {}
+        self._build = self._compile(blocks)
+        self._json = self._compile_json(json.dumps(blocks, ensure_ascii=False))
+
+
+    @property
+    def slots(self)->tuple:
+        ''' Names of the slots, in order of appearance '''
+        return tuple(self._slots)
+
+
+    def render(self, **values)->list:
+        ''' Returns the blocks with their slots filled '''
+        try:
+            return self._build(values) if self._build is not None else list(self.blocks)
+        except KeyError as error:
+            raise KeyError(f"<!> Missing value for template slot {error}") from None
+
+
+    def render_json(self, **values)->str:
+        ''' Returns the serialized blocks with their slots filled,
+        by inserting the values between the pre-serialized static parts
+        (e.g. for views or requests sent without SlackTools)
+        '''
+        parts = []
+        try:
+            for part in self._json:
+                if isinstance(part, str):
+                    parts.append(part)
+                    continue
+                name, spec, whole = part
+                value = values[name]
+                if whole:
+                    parts.append(json.dumps(value if isinstance(value, (list, dict)) else str(value)))
+                else:
+                    parts.append(json.dumps(format(value, spec))[1:-1])
+        except KeyError as error:
+            raise KeyError(f"<!> Missing value for template slot {error}") from None
+        return ''.join(parts)
+
+
+    def _compile(self, node):
+        ''' Returns a function building node from the slot values, None if node is static '''
+        if isinstance(node, str):
+            return self._compile_text(node)
+
+        if isinstance(node, dict):
+            builders = [(key, self._compile(value)) for key, value in node.items()]
+            builders = [(key, build) for key, build in builders if build is not None]
+            if not builders and not isinstance(node.get("text"), str):
+                return None
+            # Objects holding a text are always copied, SlackTools.parse_tags rewrites it
+            static = dict(node)
+            def build_dict(values):
+                obj = dict(static)
+                for key, build in builders:
+                    obj[key] = build(values)
+                return obj
+            return build_dict
+
+        if isinstance(node, list):
+            builders = [self._compile(value) for value in node]
+            if all(build is None for build in builders):
+                return None
+            items = list(zip(node, builders))
+            def build_list(values):
+                return [value if build is None else build(values) for value, build in items]
+            return build_list
+
+        return None
+
+
+    def _compile_text(self, text:str):
+        # [text, name, spec, text, name, spec, ..., text]
+        parts = SLOT.split(text)
+        if len(parts) == 1:
+            return None
+
+        names = parts[1::3]
+        for name in names:
+            self._slots[name] = None
+
+        if len(parts) == 4 and parts[0] == parts[3] == '' and parts[2] is None:
+            name = names[0]
+            def build_slot(values):
+                value = values[name]
+                return value if isinstance(value, (list, dict)) else str(value)
+            return build_slot
+
+        first = parts[0]
+        fills = list(zip(names, [spec or '' for spec in parts[2::3]], parts[3::3]))
+        def build_text(values):
+            chunks = [first]
+            for name, spec, after in fills:
+                chunks.append(format(values[name], spec))
+                chunks.append(after)
+            return ''.join(chunks)
+        return build_text
+
+
+    @staticmethod
+    def _compile_json(serialized:str)->list:
+        ''' Splits the serialized layout in static strings and (name, spec, whole) slots '''
+        parts = []
+        start = 0
+        for match in JSON_SLOT.finditer(serialized):
+            parts.append(serialized[start:match.start()])
+            if match.group(1) is not None:
+                parts.append((match.group(1), '', True))
+            else:
+                parts.append((match.group(2), match.group(3) or '', False))
+            start = match.end()
+        parts.append(serialized[start:])
+        return parts
@@ -1,4 +1,4 @@
-def add_home(title, blocks=[], callback_id=None, private_metadata=None):
+def add_home(title, blocks=None, callback_id=None, private_metadata=None):
     ''' See https://api.slack.com/reference/surfaces/views '''
     view = {
         "type": "home",
@@ -7,7 +7,7 @@ def add_home(title, blocks=[], callback_id=None, private_metadata=None):
             "text": title,
             "emoji": True
         },
-        "blocks": blocks
+        "blocks": [] if blocks is None else blocks
     }
     if callback_id:
         view.update(
@@ -24,7 +24,7 @@ def add_home(title, blocks=[], callback_id=None, private_metadata=None):
     return view
 
 
-def add_modal(title, blocks=[], submit=False, callback_id=None, private_metadata=None):
+def add_modal(title, blocks=None, submit=False, callback_id=None, private_metadata=None):
     ''' See https://api.slack.com/reference/surfaces/views '''
     view = {
         "type": "modal",
@@ -38,7 +38,7 @@ def add_modal(title, blocks=[], submit=False, callback_id=None, private_metadata
             "text": "Close",
             "emoji": True
         },
-        "blocks": blocks
+        "blocks": [] if blocks is None else blocks
     }
     if callback_id:
         view.update(
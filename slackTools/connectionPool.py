@@ -0,0 +1,128 @@
+# Standard Library
+import io
+import ssl
+import threading
+import http.client
+from collections import deque
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+
+# Slack
+from slack_sdk.webhook import WebhookClient
+from slack_sdk.webhook.webhook_response import WebhookResponse
+
+
+class ConnectionPool:
+    ''' Keep-alive HTTP(S) connections to a single host
+    Connections are checked out by one thread at a time and returned when done,
+    so the TCP+TLS handshake is only paid when the pool runs dry.
+
+    var url:str = any URL on the host to connect to,
+    var timeout:float = socket timeout in seconds,
+    var ssl_context:ssl.SSLContext = context for https, defaults to the system's,
+    var maxsize:int = maximum number of idle connections kept open
+    '''
+
+    def __init__(self, url:str, timeout:float=3, ssl_context:ssl.SSLContext=None, maxsize:int=4):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f"<!> Invalid URL detected: {url}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self.maxsize = maxsize
+        self._idle = deque()
+        self._lock = threading.Lock()
+
+
+    def _connect(self):
+        if self.scheme == 'https':
+            context = self.ssl_context or ssl.create_default_context()
+            return http.client.HTTPSConnection(
+                self.host, self.port, timeout=self.timeout, context=context)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+
+    def request(self, method:str, url:str, body=None, headers:dict=None):
+        ''' Performs a request on a pooled connection
+        Returns (status, reason, headers, body:bytes)
+        '''
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        reused = conn is not None
+        if conn is None:
+            conn = self._connect()
+
+        try:
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                response = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if not reused:
+                    raise
+                # The server closed an idle keep-alive connection, retry once on a fresh one
+                conn = self._connect()
+                conn.request(method, path, body=body, headers=headers or {})
+                response = conn.getresponse()
+            data = response.read()
+        except Exception:
+            # Never leak the socket, whether the first attempt or the retry failed
+            conn.close()
+            raise
+
+        if response.will_close:
+            conn.close()
+        else:
+            with self._lock:
+                if len(self._idle) < self.maxsize:
+                    self._idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+        return response.status, response.reason, response.headers, data
+
+
+    def close(self):
+        ''' Closes idle connections '''
+        with self._lock:
+            while self._idle:
+                self._idle.pop().close()
+
+
+class PooledWebhookClient(WebhookClient):
+    ''' WebhookClient that reuses keep-alive connections across sends
+    Retries and error handling are inherited, only the transport is replaced.
+    Falls back to the default urllib transport when a proxy is configured.
+    '''
+
+    def __init__(self, url:str, *args, **kwargs):
+        super().__init__(url, *args, **kwargs)
+        self.pool = ConnectionPool(url, timeout=self.timeout, ssl_context=self.ssl)
+
+
+    def _perform_http_request_internal(self, url:str, req):
+        if self.proxy is not None:
+            return super()._perform_http_request_internal(url, req)
+
+        status, reason, headers, data = self.pool.request(
+            req.get_method(), url, body=req.data, headers=dict(req.header_items()))
+
+        if status >= 400:
+            # Let WebhookClient._perform_http_request handle it, as with urllib
+            raise HTTPError(url, status, reason, headers, io.BytesIO(data))
+
+        charset = headers.get_content_charset() or "utf-8"
+        return WebhookResponse(
+            url=url,
+            status_code=status,
+            body=data.decode(charset),
+            headers=headers,
+        )
@@ -0,0 +1,104 @@
+# Standard Library
+import json
+import time
+import threading
+from collections import OrderedDict
+
+# Custom
+try:
+    from .payloadGuard import message_text
+except:
+    from payloadGuard import message_text
+
+
+# Characters of a suppressed message quoted in the summary
+PREVIEW_LENGTH = 80
+
+# Suppressed messages listed in a summary, the others are only counted
+MAX_SUMMARY_LINES = 20
+
+
+class DuplicateFilter:
+    ''' Suppresses messages identical to one sent to the same destination less than ttl seconds ago
+    Messages are fingerprinted after tag resolution, the fingerprints of the max_entries most
+    recent messages are kept (LRU). Once ttl seconds after the first suppression, a single
+    summary per destination reports how many duplicates were suppressed, so a storm of
+    identical alerts costs at most one message per ttl plus one summary.
+
+    var send = callable(destination, blocks, attachments, text) posting a summary,
+    var ttl:float = seconds during which a message suppresses its duplicates,
+    var max_entries:int = maximum number of fingerprints remembered
+    '''
+
+    def __init__(self, send, ttl:float=60., max_entries:int=1024):
+        self.send = send
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.suppressed = 0         # Duplicates suppressed since creation
+        # fingerprint -> [expiry, destination, suppressed, preview]
+        self._entries = OrderedDict()
+        # Evicted entries with suppressed duplicates, still to be reported
+        self._evicted = []
+        self._timer = None
+        self._lock = threading.Lock()
+
+
+    def check(self, destination:str, blocks:list, attachments:list, text:str)->bool:
+        ''' Returns True if the message must be sent, False if it is a duplicate '''
+        try:
+            key = hash(json.dumps((destination, blocks, attachments, text), separators=(',', ':')))
+        except (TypeError, ValueError):
+            # Not serializable, let the send fail and report it
+            return True
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                entry[2] += 1
+                self.suppressed += 1
+                if entry[3] is None:
+                    preview = " ".join(message_text(blocks, attachments, text).split())
+                    entry[3] = preview[:PREVIEW_LENGTH].replace('`', "'")
+                self._entries.move_to_end(key)
+                if self._timer is None:
+                    self._timer = threading.Timer(self.ttl, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return False
+
+            if entry is not None and entry[2]:
+                # Expired, its duplicates are still to be reported
+                self._evicted.append(entry)
+            self._entries[key] = [now + self.ttl, destination, 0, None]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                if evicted[2]:
+                    self._evicted.append(evicted)
+            return True
+
+
+    def flush(self):
+        ''' Sends the summaries of the duplicates suppressed so far '''
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            reports = {}
+            for entry in self._evicted + [entry for entry in self._entries.values() if entry[2]]:
+                reports.setdefault(entry[1], []).append((entry[2], entry[3]))
+                entry[2] = 0
+            self._evicted = []
+
+        for destination, counts in reports.items():
+            total = sum(count for count, _ in counts)
+            text = f"Suppressed {total} duplicate message{'s' if total > 1 else ''}"
+            lines = [f":mute: *{text}*"]
+            lines.extend(f"• {count} × `{preview}`" for count, preview in counts[:MAX_SUMMARY_LINES])
+            if len(counts) > MAX_SUMMARY_LINES:
+                lines.append(f"• ... and {len(counts) - MAX_SUMMARY_LINES} other messages")
+            blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": "\n".join(lines)}}]
+            try:
+                self.send(destination, blocks, [], text)
+            except Exception as error:
+                print(f"<?> Error sending duplicates summary to slack: {error}")
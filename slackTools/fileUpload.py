@@ -0,0 +1,138 @@
+# Standard Library
+import io
+import os
+import ssl
+import http.client
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+
+# Upload chunk size, memory use is bounded by it whatever the file size
+CHUNK_SIZE = 1 << 20
+
+
+def stream_upload(
+        url:str,
+        file,
+        length:int,
+        chunk_size:int=CHUNK_SIZE,
+        progress=None,
+        timeout:float=60,
+        ssl_context:ssl.SSLContext=None
+    )->int:
+    ''' Streams a file to an upload URL returned by files.getUploadURLExternal
+    var url:str = upload URL,
+    var file = binary file object opened for reading,
+    var length:int = number of bytes to send (announced to files.getUploadURLExternal),
+    var chunk_size:int = number of bytes read and sent at once,
+    var progress = optional callable(bytes_sent:int, bytes_total:int) called after each chunk,
+    var timeout:float = socket timeout in seconds,
+    var ssl_context:ssl.SSLContext = context for https, defaults to the system's
+    Returns the HTTP status code of the upload
+    '''
+    parts = urlsplit(url)
+    if parts.scheme == 'https':
+        conn = http.client.HTTPSConnection(
+            parts.hostname, parts.port, timeout=timeout,
+            context=ssl_context or ssl.create_default_context())
+    elif parts.scheme == 'http':
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=timeout)
+    else:
+        raise ValueError(f"<!> Invalid upload URL detected: {url}")
+
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+
+    try:
+        conn.putrequest('POST', path)
+        conn.putheader('Content-Type', 'application/octet-stream')
+        conn.putheader('Content-Length', str(length))
+        conn.endheaders()
+
+        # Reuse a single buffer when the file supports it
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        readinto = getattr(file, 'readinto', None)
+
+        sent = 0
+        while sent < length:
+            size = min(chunk_size, length - sent)
+            if readinto is not None:
+                n = readinto(view[:size])
+                chunk = view[:n]
+            else:
+                chunk = file.read(size)
+                n = len(chunk)
+            if not n:
+                raise EOFError(f"<!> File ended after {sent} of {length} bytes")
+            conn.send(chunk)
+            sent += n
+            if progress is not None:
+                progress(sent, length)
+
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+
+class MemoryReader:
+    ''' Binary file over a bytes-like object, read() returns memoryview slices (no copies) '''
+
+    def __init__(self, data):
+        self.view = memoryview(data).cast('B')
+        self.position = 0
+
+    def read(self, size:int=-1):
+        end = len(self.view) if size is None or size < 0 else self.position + size
+        chunk = self.view[self.position:end]
+        self.position += len(chunk)
+        return chunk
+
+
+def render_figure(figure, filename:str=None)->tuple:
+    ''' Renders a matplotlib figure in memory, in the format given by the extension of
+    filename (png by default). Returns (buffer:memoryview, filename:str)
+    '''
+    filename = filename or "figure.png"
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format=os.path.splitext(filename)[1][1:] or "png")
+    # View of the rendered image, not a copy
+    return buffer.getbuffer(), filename
+
+
+@contextmanager
+def open_source(source, filename:str=None):
+    ''' Opens anything send_file accepts as a binary stream:
+    a path, bytes, bytearray, memoryview, a binary file object or a matplotlib figure.
+    Yields (stream, filename:str, length:int), paths are closed on exit
+    '''
+    if isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        with open(path, 'rb') as file:
+            yield file, filename or os.path.basename(path), os.fstat(file.fileno()).st_size
+        return
+
+    if hasattr(source, 'savefig'):
+        source, filename = render_figure(source, filename)
+
+    elif hasattr(source, 'read'):
+        if isinstance(source, io.TextIOBase):
+            raise TypeError("<!> Files must be opened in binary mode ('rb') to be uploaded.")
+        filename = filename or os.path.basename(str(getattr(source, 'name', ''))) or "file"
+        try:
+            # Uploaded from the current position
+            start = source.tell()
+            length = source.seek(0, io.SEEK_END) - start
+            source.seek(start)
+        except (AttributeError, OSError, ValueError):
+            # Not seekable (pipe, socket...), read in memory to know its length
+            source = source.read()
+        else:
+            yield source, filename, length
+            return
+
+    reader = MemoryReader(source)
+    yield reader, filename or "file", len(reader.view)
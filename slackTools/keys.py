@@ -1,9 +1,56 @@
 import os
-import toml
+import threading
 
 
-def load(filepath=None, verbose=False):
-    '''Load slack keys, searching the following locations:
+# Seconds between checks of the keys file for changes (see SlackTools.config)
+RELOAD_INTERVAL = 1.
+
+# Parsed keys files, by path: (mtime, size, KeyConfig)
+_cache = {}
+# Keys file found for each requested filepath
+_found = {}
+_lock = threading.Lock()
+
+
+class KeyConfig(dict):
+    ''' Validated Slack keys config
+    Behaves as the parsed TOML (config['SLACK_CHANNEL'][...]), with flat lookup tables:
+    var path:str = path of the keys file,
+    var channels:dict = channel name -> channel ID (SLACK_CHANNEL),
+    var users:dict = user name -> Slack user ID (SLACK_USERS),
+    var webhooks:dict = webhook alias -> webhook URL (SLACK_WEBHOOK),
+    var notify:list = users notified on initialization and termination
+    '''
+
+    def __init__(self, data:dict, path:str=None):
+        super().__init__(data)
+        self.path = path
+
+        # Optional sections
+        for section in ('SLACK_CHANNEL', 'SLACK_USERS', 'SLACK_WEBHOOK', 'SLACK_BOT'):
+            self.setdefault(section, {})
+            if not isinstance(self[section], dict):
+                raise ValueError(f"<!> Invalid Slack keys file {path}: [{section}] must be a table")
+        self.setdefault('SLACK_NOTIFICATION', {}).setdefault('NOTIFY_ON_EVENT', [])
+
+        self.channels = self._table('SLACK_CHANNEL')
+        self.users = self._table('SLACK_USERS')
+        self.webhooks = self._table('SLACK_WEBHOOK')
+        self.notify = list(self['SLACK_NOTIFICATION']['NOTIFY_ON_EVENT'])
+
+
+    def _table(self, section:str)->dict:
+        ''' Returns a section as a flat dict of strings '''
+        for key, value in self[section].items():
+            if not isinstance(value, str):
+                raise ValueError(
+                    f"<!> Invalid Slack keys file {self.path}: [{section}] {key} must be a string")
+        return self[section]
+
+
+
+def find(filepath=None):
+    '''Find the slack keys file, searching the following locations:
     - 1st: Provided filepath
     - 2nd: Default local storage location in project root directory under .slack.key.toml
     - 3rd: Default global storage location in home directory under ~/.slack/slack.key.toml
@@ -42,13 +89,43 @@ def load(filepath=None, verbose=False):
             f"\n2. Local default hidden: {filepath_default_local_hidden}" \
             f"\n3. Global default: {filepath_default_global}."
         )
+    return keypath
+
+
+def load(filepath=None, verbose=False)->KeyConfig:
+    '''Load slack keys, searching the following locations:
+    - 1st: Provided filepath
+    - 2nd: Default local storage location in project root directory under .slack.key.toml
+    - 3rd: Default global storage location in home directory under ~/.slack/slack.key.toml
+    The parsed config is cached, and only parsed again when the file changes.
+    '''
+    keypath = _found.get(filepath)
+    try:
+        stat = os.stat(keypath) if keypath else None
+    except OSError:
+        stat = None
+    if stat is None:
+        keypath = find(filepath)
+        stat = os.stat(keypath)
+        # Only direct hits are remembered: a fallback is looked up again,
+        # so that a keys file created later at filepath is picked up
+        if keypath == filepath:
+            _found[filepath] = keypath
+
+    with _lock:
+        cached = _cache.get(keypath)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+
+        import toml
 
-    if verbose:
-        print(f"Retrieving Slack Keys from {keypath} ... ", sep='', end='')
-    data = toml.load(keypath)
-    if verbose:
-        print("Done!")
-    return data
+        if verbose:
+            print(f"Retrieving Slack Keys from {keypath} ... ", sep='', end='')
+        data = KeyConfig(toml.load(keypath), path=keypath)
+        if verbose:
+            print("Done!")
+        _cache[keypath] = (stat.st_mtime_ns, stat.st_size, data)
+        return data
 
 
 # TESTING
@@ -0,0 +1,112 @@
+# Standard Library
+import json
+import atexit
+import threading
+
+# Custom
+try:
+    from .payloadGuard import MAX_PAYLOAD_BYTES
+except:
+    from payloadGuard import MAX_PAYLOAD_BYTES
+
+
+class MessageBatcher:
+    ''' Coalesces messages sent to the same destination within a time window
+    The first message to a destination opens a window, every message to that destination
+    arriving before it closes is merged into as few posts as Slack's block limit allows.
+
+    var send = callable(destination, blocks, attachments, text) posting one merged message,
+    var window:float = seconds to wait for more messages after the first one,
+    var max_blocks:int = maximum number of blocks per post (Slack's limit is 50),
+    var max_bytes:int = maximum serialized size of a post
+    '''
+
+    MAX_BLOCKS = 50
+
+    def __init__(
+            self,
+            send,
+            window:float=1.,
+            max_blocks:int=MAX_BLOCKS,
+            max_bytes:int=MAX_PAYLOAD_BYTES
+        ):
+        self.send = send
+        self.window = window
+        self.max_blocks = max_blocks
+        self.max_bytes = max_bytes
+        self._pending = {}
+        self._timers = {}
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+
+    def add(self, destination:str, blocks:list, attachments:list, text:str):
+        ''' Queues a message, the merged post is sent when the window closes '''
+        with self._lock:
+            self._pending.setdefault(destination, []).append((blocks, attachments, text))
+            if destination not in self._timers:
+                timer = threading.Timer(self.window, self._flush_destination, (destination,))
+                timer.daemon = True
+                self._timers[destination] = timer
+                timer.start()
+
+
+    def flush(self):
+        ''' Sends every pending message now '''
+        with self._lock:
+            destinations = list(self._pending)
+        for destination in destinations:
+            self._flush_destination(destination)
+
+
+    def _flush_destination(self, destination:str):
+        with self._lock:
+            timer = self._timers.pop(destination, None)
+            messages = self._pending.pop(destination, [])
+        if timer is not None:
+            timer.cancel()
+        for blocks, attachments, text in self.merge(messages):
+            try:
+                self.send(destination, blocks, attachments, text)
+            except Exception as error:
+                print(f"<?> Error sending batched message to slack: {error}")
+
+
+    def merge(self, messages:list)->list:
+        ''' Merges (blocks, attachments, text) messages into as few posts as possible
+        Messages are kept whole unless one alone exceeds max_blocks.
+        '''
+        posts = []
+        blocks, attachments, texts = [], [], []
+        size = [0]
+
+        def emit():
+            if blocks or attachments or texts:
+                posts.append((list(blocks), list(attachments), "\n".join(texts)))
+                blocks.clear()
+                attachments.clear()
+                texts.clear()
+            size[0] = 0
+
+        for message_blocks, message_attachments, message_text in messages:
+            if not message_blocks and message_text and len(messages) > 1:
+                # Text only message, keep it visible once merged
+                message_blocks = [{
+                    "type": "section",
+                    "text": {"type": "mrkdwn", "text": message_text}
+                }]
+
+            message_size = len(json.dumps([message_blocks, message_attachments, message_text]))
+            if len(blocks) + len(message_blocks) > self.max_blocks \
+                    or size[0] + message_size > self.max_bytes:
+                emit()
+            size[0] += message_size
+            for i in range(0, max(len(message_blocks), 1), self.max_blocks):
+                if i:
+                    emit()
+                blocks.extend(message_blocks[i:i + self.max_blocks])
+            attachments.extend(message_attachments)
+            if message_text:
+                texts.append(message_text)
+        emit()
+        return posts
@@ -0,0 +1,163 @@
+# Standard Library
+import bisect
+import threading
+
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1., 2.5, 5., 10., 30., 60.)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1 << 20, 1 << 24, 1 << 28)
+
+
+class Histogram:
+    ''' Cumulative histogram with fixed buckets, as used by Prometheus
+    var buckets:tuple = sorted bucket upper bounds, +Inf is implied
+    '''
+
+    def __init__(self, buckets:tuple):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.
+
+
+    def observe(self, value:float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+    def quantile(self, q:float)->float:
+        ''' Estimates a quantile by linear interpolation within its bucket '''
+        if not self.count:
+            return 0.
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = self.buckets[i - 1] if i > 0 else 0.
+                if i == len(self.buckets):
+                    # Beyond the last bucket, the best estimate is its bound
+                    return lower
+                return lower + (self.buckets[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+class Metrics:
+    ''' In-process collector of SlackTools send records
+    Pass an instance (or metrics=True) to a SlackTools client, then read summary()
+    or export to_prometheus(), optionally over HTTP with serve().
+    Any callable(record:dict) can be used as a metrics hook instead, records hold:
+        kind:str = 'message' or 'file',
+        destination:str = channel ID or webhook URL,
+        seconds:float = wall time of the call, retries included,
+        queue_wait:float = seconds spent in the send queue (non_blocking),
+        bytes:int = payload size,
+        retries:int = retries by the retry handlers,
+        status:int = HTTP status of the last response, None if there was none,
+        ok:bool = whether the call succeeded,
+        error:str = error message, None on success
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+
+
+    def __call__(self, record:dict):
+        ''' Metrics hook, records a send '''
+        kind = record["kind"]
+        outcome = "ok" if record["ok"] else "error"
+        with self._lock:
+            self._histogram("slack_send_duration_seconds", kind, LATENCY_BUCKETS) \
+                .observe(record["seconds"])
+            self._histogram("slack_queue_wait_seconds", kind, LATENCY_BUCKETS) \
+                .observe(record["queue_wait"])
+            self._histogram("slack_payload_bytes", kind, SIZE_BUCKETS) \
+                .observe(record["bytes"])
+            key = ("slack_sends_total", (("kind", kind), ("outcome", outcome),
+                ("status", str(record["status"]))))
+            self.counters[key] = self.counters.get(key, 0) + 1
+            key = ("slack_retries_total", (("kind", kind),))
+            self.counters[key] = self.counters.get(key, 0) + record["retries"]
+
+
+    def _histogram(self, name:str, kind:str, buckets:tuple)->Histogram:
+        key = (name, (("kind", kind),))
+        if key not in self.histograms:
+            self.histograms[key] = Histogram(buckets)
+        return self.histograms[key]
+
+
+    def summary(self)->dict:
+        ''' Returns {metric{labels}: value} for counters and
+        {metric{labels}: {count, sum, p50, p90, p99}} for histograms
+        '''
+        with self._lock:
+            summary = {_series(*key): value for key, value in self.counters.items()}
+            for key, histogram in self.histograms.items():
+                summary[_series(*key)] = {
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "p50": histogram.quantile(.5),
+                    "p90": histogram.quantile(.9),
+                    "p99": histogram.quantile(.99),
+                }
+        return summary
+
+
+    def to_prometheus(self)->str:
+        ''' Returns the metrics in the Prometheus text exposition format '''
+        lines = []
+        with self._lock:
+            for name in sorted({key[0] for key in self.counters}):
+                lines.append(f"# TYPE {name} counter")
+                for (metric, labels), value in sorted(self.counters.items()):
+                    if metric == name:
+                        lines.append(f"{_series(name, labels)} {value}")
+
+            for name in sorted({key[0] for key in self.histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (metric, labels), histogram in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    bounds = [repr(float(b)) for b in histogram.buckets] + ["+Inf"]
+                    for bound, n in zip(bounds, histogram.counts):
+                        cumulative += n
+                        lines.append(
+                            f"{_series(name + '_bucket', labels + (('le', bound),))} {cumulative}")
+                    lines.append(f"{_series(name + '_sum', labels)} {histogram.sum}")
+                    lines.append(f"{_series(name + '_count', labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+    def serve(self, port:int=9464, address:str=''):
+        ''' Serves to_prometheus() over HTTP from a daemon thread, returns the server '''
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.to_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((address, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def _series(name:str, labels:tuple)->str:
+    ''' Formats a series as name{label="value",...} '''
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
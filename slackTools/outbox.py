@@ -0,0 +1,259 @@
+# Standard Library
+import os
+import json
+import hashlib
+import time
+import atexit
+import threading
+
+
+def is_transient(error:Exception)->bool:
+    ''' Whether a failed send may succeed later (connection lost, rate limited, server error) '''
+    if isinstance(error, OSError):
+        # URLError, socket errors, timeouts, connection resets...
+        return True
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status is not None and (status == 429 or status >= 500)
+
+
+def is_rejected(error:Exception)->bool:
+    ''' Whether Slack answered and refused the message for good (invalid payload, unknown channel...) '''
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status is not None and not is_transient(error)
+
+
+class Outbox:
+    ''' Durable, ordered, on-disk queue of messages that could not be delivered (SQLite)
+    Appends are buffered and written in batches, replayed messages are deleted
+    and the file is compacted incrementally.
+    One file can be shared by several clients and processes: each message is recorded
+    with the client (class) and token that sent it and only replayed by them, and rows
+    are claimed before being sent so that two processes never replay the same message.
+
+    var filepath:str = path of the SQLite file,
+    var client:str = name of the client class the messages belong to,
+    var token:str = token (or webhook URL) of the client, only a hash of it is stored,
+    var max_entries:int = maximum number of messages kept (per client and token),
+        the oldest are dropped first,
+    var batch_size:int = number of buffered messages that triggers a write,
+    var flush_interval:float = maximum seconds a message stays buffered in memory,
+    var claim_timeout:float = seconds after which rows claimed by a replay that did not
+        finish (e.g. a process that was killed) can be claimed again
+    '''
+
+    def __init__(
+            self,
+            filepath:str,
+            client:str=str(),
+            token:str=str(),
+            max_entries:int=10000,
+            batch_size:int=100,
+            flush_interval:float=1.,
+            claim_timeout:float=300.
+        ):
+        self.filepath = filepath
+        self.client = client
+        self.owner = hashlib.sha256(f"{client}\n{token}".encode('utf-8')).hexdigest()
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.claim_timeout = claim_timeout
+        # Identifies this outbox's claims, unique per process and instance
+        self._claimant = f"{os.getpid()}:{id(self)}:{time.time()}"
+
+        self._buffer = []
+        self._timer = None
+        self._closed = False
+        self._lock = threading.RLock()
+
+        import sqlite3
+        self._db = sqlite3.connect(filepath, timeout=30., check_same_thread=False)
+        with self._lock, self._db:
+            # Must be set before the table is created to take effect
+            self._db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self._db.execute("PRAGMA journal_mode = WAL")
+            self._db.execute("PRAGMA synchronous = NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "created REAL NOT NULL, "
+                "destination TEXT NOT NULL, "
+                "payload TEXT NOT NULL)"
+            )
+            # Files written before messages were recorded per client and token
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(outbox)")}
+            for column, definition in (
+                    ("owner", "TEXT NOT NULL DEFAULT ''"),
+                    ("claimed_by", "TEXT"),
+                    ("claimed_at", "REAL")):
+                if column not in columns:
+                    self._db.execute(f"ALTER TABLE outbox ADD COLUMN {column} {definition}")
+            self._db.execute("CREATE INDEX IF NOT EXISTS outbox_owner ON outbox (owner, id)")
+        atexit.register(self.close)
+
+
+    def __len__(self):
+        with self._lock:
+            count = self._db.execute(
+                "SELECT COUNT(*) FROM outbox WHERE owner = ?", (self.owner,)).fetchone()[0]
+            return count + len(self._buffer)
+
+
+    def append(self, destination:str, blocks:list, attachments:list, text:str):
+        ''' Records an unsent message '''
+        payload = json.dumps({"blocks": blocks, "attachments": attachments, "text": text})
+        with self._lock:
+            self._buffer.append((time.time(), destination, payload, self.owner))
+            if self._closed or len(self._buffer) >= self.batch_size:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+
+    def flush(self):
+        ''' Writes buffered messages to disk, dropping the oldest beyond max_entries '''
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._buffer:
+                return
+            with self._db:
+                self._db.executemany(
+                    "INSERT INTO outbox (created, destination, payload, owner) VALUES (?, ?, ?, ?)",
+                    self._buffer)
+                self._buffer.clear()
+
+                overflow = self._db.execute(
+                    "SELECT COUNT(*) FROM outbox WHERE owner = ?", (self.owner,)).fetchone()[0] \
+                    - self.max_entries
+                if overflow > 0:
+                    print(f"<?> SlackTools outbox is full, dropping {overflow} oldest message(s)")
+                    self._db.execute(
+                        "DELETE FROM outbox WHERE id IN "
+                        "(SELECT id FROM outbox WHERE owner = ? ORDER BY id LIMIT ?)",
+                        (self.owner, overflow))
+            if overflow > 0:
+                self.compact()
+
+
+    def _claim(self, batch:int)->list:
+        ''' Claims the next rows of this client and token in a single (atomic) UPDATE,
+        returns them in order as (id, destination, payload)
+        '''
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE outbox SET claimed_by = ?, claimed_at = ? WHERE id IN "
+                "(SELECT id FROM outbox WHERE owner = ? "
+                "AND (claimed_by IS NULL OR claimed_at < ?) ORDER BY id LIMIT ?)",
+                (self._claimant, now, self.owner, now - self.claim_timeout, batch))
+            return self._db.execute(
+                "SELECT id, destination, payload FROM outbox WHERE claimed_by = ? ORDER BY id",
+                (self._claimant,)).fetchall()
+
+
+    def replay(self, send, batch:int=100)->int:
+        ''' Sends recorded messages in order, deleting each one once delivered
+        var send = callable(destination, blocks, attachments, text), raising on failure
+        Stops at the first failure, unless Slack rejected the message for good,
+        in which case it is dropped.
+        Returns the number of messages delivered
+        '''
+        delivered = 0
+        while True:
+            with self._lock:
+                self.flush()
+            rows = self._claim(batch)
+            if not rows:
+                break
+
+            done = []
+            stop = False
+            for row_id, destination, payload in rows:
+                message = json.loads(payload)
+                try:
+                    send(destination, message["blocks"], message["attachments"], message["text"])
+                    delivered += 1
+                except Exception as error:
+                    if not is_rejected(error):
+                        # Retried later (connection lost, rate limited, client not ready...)
+                        if not is_transient(error):
+                            print(f"<?> Error replaying SlackTools outbox: {error}")
+                        stop = True
+                        break
+                    print(f"<?> Dropping message from SlackTools outbox: {error}")
+                done.append((row_id,))
+
+            with self._lock, self._db:
+                self._db.executemany("DELETE FROM outbox WHERE id = ?", done)
+                # Release the rows that were not sent
+                self._db.execute(
+                    "UPDATE outbox SET claimed_by = NULL, claimed_at = NULL WHERE claimed_by = ?",
+                    (self._claimant,))
+            if stop:
+                break
+        self.compact()
+        return delivered
+
+
+    def compact(self):
+        ''' Returns the pages freed by delivered messages to the file system '''
+        with self._lock:
+            self._db.execute("PRAGMA incremental_vacuum").fetchall()
+
+
+    def close(self):
+        ''' Writes buffered messages, later appends are written immediately '''
+        atexit.unregister(self.close)
+        with self._lock:
+            self._closed = True
+            self.flush()
+
+
+# TESTING
+if __name__ == "__main__":
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    with tempfile.TemporaryDirectory() as directory:
+        filepath = os.path.join(directory, "outbox.sqlite")
+
+        # Clients sharing a keys file only replay their own messages
+        webhook = Outbox(filepath, "SlackTools_webhook", "https://hooks.slack.com/services/T/B/X")
+        bot = Outbox(filepath, "SlackTools_bot", "xoxb-1")
+        other_bot = Outbox(filepath, "SlackTools_bot", "xoxb-2")
+        webhook.append("https://hooks.slack.com/services/T/B/X", [], [], "webhook message")
+        bot.append("C0001", [], [], "bot message")
+        sent = []
+        assert bot.replay(lambda *message: sent.append(message)) == 1
+        assert sent == [("C0001", [], [], "bot message")], sent
+        assert other_bot.replay(lambda *message: sent.append(message)) == 0
+        assert len(webhook) == 1
+
+        # Processes sharing the file (one Outbox each) never send a message twice
+        for i in range(200):
+            bot.append("C0001", [], [], f"message {i}")
+        bot.flush()
+        replays = [Outbox(filepath, "SlackTools_bot", "xoxb-1") for _ in range(4)]
+        sent = []
+        def send(*message):
+            time.sleep(0.001)
+            sent.append(message[3])
+        with ThreadPoolExecutor(len(replays)) as pool:
+            delivered = sum(pool.map(lambda outbox: outbox.replay(send, batch=10), replays))
+        assert delivered == 200 and sorted(sent) == sorted(f"message {i}" for i in range(200)), \
+            f"{delivered} delivered, {len(set(sent))} distinct"
+        assert len(bot) == 0 and len(webhook) == 1
+
+        # A local error keeps the message, a rejection by Slack drops it
+        class Rejected(Exception):
+            response = type("Response", (), {"status_code": 200})()
+        bot.append("C0001", [], [], "kept")
+        bot.replay(lambda *message: {}["not ready"])
+        assert len(bot) == 1
+        bot.replay(lambda *message: (_ for _ in ()).throw(Rejected("channel_not_found")))
+        assert len(bot) == 0
+    print("Outbox OK")
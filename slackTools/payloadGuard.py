@@ -0,0 +1,129 @@
+# Standard Library
+import json
+
+
+# Slack message limits
+# See https://api.slack.com/reference/block-kit/blocks
+MAX_BLOCKS = 50                 # Blocks per message
+MAX_SECTION_TEXT = 3000         # Characters per section text
+MAX_HEADER_TEXT = 150           # Characters per header text
+MAX_TEXT = 40000                # Characters of the top-level text (truncated by Slack beyond)
+MAX_PAYLOAD_BYTES = 40000       # Serialized message, Slack rejects much larger payloads
+
+# Messages longer than this many posts are uploaded as a text file instead (bot only)
+MAX_PARTS = 5
+
+
+def split_text(text:str, limit:int)->list:
+    ''' Splits text in chunks of at most limit characters,
+    preferably at line breaks, then at spaces
+    '''
+    chunks = []
+    while len(text) > limit:
+        cut = text.rfind('\n', 0, limit + 1)
+        if cut <= 0:
+            cut = text.rfind(' ', 0, limit + 1)
+        if cut <= 0:
+            cut = limit
+        chunks.append(text[:cut])
+        # Drop the line break (or space) the text was split at
+        text = text[cut + 1:] if text[cut:cut + 1] in ('\n', ' ') else text[cut:]
+    chunks.append(text)
+    return chunks
+
+
+def _split_block(block:dict)->list:
+    ''' Splits a section whose text is too long in several sections,
+    truncates a header whose text is too long
+    '''
+    text = block.get("text")
+    if block.get("type") == "header" and isinstance(text, dict) \
+            and len(text.get("text", "")) > MAX_HEADER_TEXT:
+        return [dict(block, text=dict(text, text=text["text"][:MAX_HEADER_TEXT]))]
+    if block.get("type") != "section" or not isinstance(text, dict) \
+            or len(text.get("text", "")) <= MAX_SECTION_TEXT:
+        return [block]
+
+    blocks = []
+    for i, chunk in enumerate(split_text(text["text"], MAX_SECTION_TEXT)):
+        part = {"type": "section", "text": dict(text, text=chunk)}
+        if i == 0:
+            # Fields and accessory stay with the first part
+            part.update({k: v for k, v in block.items() if k not in ("type", "text")})
+        elif "block_id" in block:
+            # Block IDs must be unique within a message
+            part["block_id"] = f"{block['block_id']}-{i}"
+        blocks.append(part)
+    return blocks
+
+
+def check_message(blocks:list, attachments:list, text:str):
+    ''' Measures a message once
+    Returns its serialized size in bytes if it is within Slack's limits, None otherwise
+    '''
+    if len(blocks) > MAX_BLOCKS or len(text) > MAX_TEXT:
+        return None
+    for block in blocks:
+        block_text = block.get("text")
+        if isinstance(block_text, dict):
+            limit = MAX_HEADER_TEXT if block.get("type") == "header" else MAX_SECTION_TEXT
+            if len(block_text.get("text", "")) > limit:
+                return None
+    size = len(json.dumps(
+        {"blocks": blocks, "attachments": attachments, "text": text}).encode('utf-8'))
+    return size if size <= MAX_PAYLOAD_BYTES else None
+
+
+def split_message(blocks:list, attachments:list, text:str)->list:
+    ''' Splits a message exceeding Slack's limits into several ordered messages
+    Long section texts are split at line breaks, long headers are truncated, blocks
+    are grouped by count and serialized size, a long top-level text is split when
+    there are no blocks.
+    Returns a list of (blocks, attachments, text) messages, None if a single block
+    is larger than MAX_PAYLOAD_BYTES on its own (it cannot be posted)
+    '''
+    if not blocks and text:
+        chunks = split_text(text, MAX_SECTION_TEXT)
+        blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": chunk}} for chunk in chunks]
+        text = chunks[0]
+
+    # Notification text, shown in notifications and where blocks cannot be
+    text = text[:MAX_SECTION_TEXT]
+    overhead = len(json.dumps({"blocks": [], "attachments": [], "text": text}).encode('utf-8'))
+
+    messages = []
+    group, size = [], overhead
+    for block in blocks:
+        for part in _split_block(block):
+            part_size = len(json.dumps(part).encode('utf-8')) + 2
+            if overhead + part_size > MAX_PAYLOAD_BYTES:
+                return None
+            if group and (len(group) >= MAX_BLOCKS or size + part_size > MAX_PAYLOAD_BYTES):
+                messages.append((group, [], text))
+                group, size = [], overhead
+            group.append(part)
+            size += part_size
+    messages.append((group, [], text))
+
+    # Attachments are displayed below the blocks, keep them with the last message
+    last_blocks, _, last_text = messages[-1]
+    messages[-1] = (last_blocks, attachments, last_text)
+    return messages
+
+
+def message_text(blocks:list, attachments:list, text:str)->str:
+    ''' Plain text of a message, in display order, for a file upload '''
+    lines = []
+    stack = [attachments, blocks]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            value = node.get("text")
+            if isinstance(value, str) and node.get("type") in ("mrkdwn", "plain_text", None):
+                lines.append(value)
+            for key in reversed(list(node)):
+                if isinstance(node[key], (dict, list)):
+                    stack.append(node[key])
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return "\n".join(lines) if lines else text
@@ -0,0 +1,128 @@
+# Standard Library
+import time
+import threading
+
+
+class ProgressReporter:
+    ''' Reports progress in a single Slack message instead of one post per update
+    The first report is posted, later ones edit it in place (chat.update) or are
+    replied in its thread. Reports are debounced: update() returns immediately and
+    only the latest report is sent, at most once per interval seconds.
+    Created by SlackTools_bot.progress(...)
+
+    var slack:SlackTools_bot = client used to post,
+    var channel_id:str = channel to post in,
+    var header:str = optional title, kept above every report,
+    var mode:str = 'update' to edit the message in place, 'thread' to reply in its thread,
+    var interval:float = minimum seconds between two messages sent to Slack
+    '''
+
+    MODES = ('update', 'thread')
+
+    def __init__(
+            self,
+            slack,
+            channel_id:str,
+            header:str=str(),
+            mode:str='update',
+            interval:float=2.
+        ):
+        if mode not in self.MODES:
+            raise ValueError(f"<!> Unknown progress mode {mode}. Please use one of {self.MODES}.")
+        self.slack = slack
+        self.channel_id = channel_id
+        self.header = header
+        self.mode = mode
+        self.interval = interval
+        self.ts = None          # Timestamp (ID) of the message, once posted
+        self.sent = 0           # Messages sent to Slack
+        self.skipped = 0        # Reports replaced by a later one before being sent
+
+        self._latest = None
+        self._last_sent = float('-inf')
+        self._timer = None
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+    def update(self, message:str):
+        ''' Reports progress, sent now or within interval seconds (never blocks) '''
+        with self._lock:
+            if self._latest is not None:
+                self.skipped += 1
+            self._latest = message
+            if self._timer is None:
+                delay = max(0., self._last_sent + self.interval - time.monotonic())
+                self._timer = threading.Timer(delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+
+    def flush(self):
+        ''' Sends the latest report now, if it was not sent yet '''
+        with self._send_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                message, self._latest = self._latest, None
+                self._last_sent = time.monotonic()
+            if message is not None:
+                self._send(message)
+
+
+    def close(self, message:str=None):
+        ''' Sends the final report (or the pending one) immediately '''
+        if message is not None:
+            with self._lock:
+                if self._latest is not None:
+                    self.skipped += 1
+                self._latest = message
+        self.flush()
+
+
+    def _blocks(self, message:str)->list:
+        blocks = []
+        if self.header:
+            blocks.append({"type": "header", "text": {"type": "plain_text", "text": self.header}})
+        blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": message}})
+        self.slack.parse_tags(blocks)
+        return blocks
+
+
+    def _send(self, message:str):
+        ''' Posts, edits or replies (blocking) '''
+        slack = self.slack
+        blocks = self._blocks(message)
+        text = self.header or message
+        size = slack._message_size(blocks, [], text)
+        try:
+            if self.ts is None:
+                if slack.rate_limiter is not None:
+                    slack.rate_limiter.acquire("chat.postMessage", self.channel_id)
+                response = slack._recorded(
+                    "message", self.channel_id, size, slack.client.chat_postMessage,
+                    channel=self.channel_id, text=text, blocks=blocks)
+                self.ts = response["ts"]
+            elif self.mode == 'update':
+                if slack.rate_limiter is not None:
+                    slack.rate_limiter.acquire("chat.update", self.channel_id)
+                slack._recorded(
+                    "message", self.channel_id, size, slack.client.chat_update,
+                    channel=self.channel_id, ts=self.ts, text=text, blocks=blocks)
+            else:
+                if slack.rate_limiter is not None:
+                    slack.rate_limiter.acquire("chat.postMessage", self.channel_id)
+                slack._recorded(
+                    "message", self.channel_id, size, slack.client.chat_postMessage,
+                    channel=self.channel_id, thread_ts=self.ts, text=message, blocks=blocks[-1:])
+            self.sent += 1
+        except Exception as error:
+            print(f"<?> Error reporting progress to slack: {error}")
@@ -0,0 +1,132 @@
+# Standard Library
+import threading
+import time
+
+
+class TokenBucket:
+    ''' Token bucket refilled at a constant rate
+    var rate:float = tokens added per second,
+    var capacity:float = maximum number of tokens (burst size)
+    '''
+
+    def __init__(self, rate:float, capacity:float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.paused_until = 0.
+        self.updated = time.monotonic()
+
+
+    def _refill(self, now:float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+    def wait_time(self, now:float)->float:
+        ''' Seconds until a token is available '''
+        self._refill(now)
+        wait = max(0., self.paused_until - now)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+
+
+    def take(self):
+        self.tokens -= 1
+
+
+    def pause(self, now:float, seconds:float):
+        ''' Holds every token for the given number of seconds '''
+        self.paused_until = max(self.paused_until, now + seconds)
+
+
+    def state(self, now:float)->dict:
+        self._refill(now)
+        return {
+            "tokens": self.tokens,
+            "capacity": self.capacity,
+            "rate": self.rate,
+            "paused_for": max(0., self.paused_until - now),
+        }
+
+
+class RateLimiter:
+    ''' Schedules Slack requests with one token bucket per channel and one per API method
+    Buckets are created on first use. A 429 response pauses only the buckets it concerns.
+
+    var channel_rate:float = messages per second per channel (Slack allows about 1),
+    var channel_burst:int = messages allowed in a burst per channel,
+    var method_rates:dict = API method -> requests per minute, overrides METHOD_RATES
+    '''
+
+    # Requests per minute per API method (Slack's rate limit tiers)
+    # See https://api.slack.com/docs/rate-limits
+    METHOD_RATES = {
+        "chat.postMessage": 600,        # Special tier, per channel limits apply
+        "chat.update": 50,              # Tier 3
+        "files.getUploadURLExternal": 100,      # Tier 4
+        "files.completeUploadExternal": 100,    # Tier 4
+        "webhook": 600,
+    }
+    DEFAULT_METHOD_RATE = 20            # Tier 2
+
+    def __init__(self, channel_rate:float=1., channel_burst:int=3, method_rates:dict=None):
+        self.channel_rate = channel_rate
+        self.channel_burst = channel_burst
+        self.method_rates = dict(self.METHOD_RATES)
+        if method_rates:
+            self.method_rates.update(method_rates)
+        self._channels = {}
+        self._methods = {}
+        self._lock = threading.Lock()
+
+
+    def _buckets(self, method:str=None, channel:str=None)->list:
+        ''' Returns the buckets for a request, creating them if needed (lock held) '''
+        buckets = []
+        if method:
+            if method not in self._methods:
+                # Bursts of up to ten seconds worth of requests
+                per_minute = self.method_rates.get(method, self.DEFAULT_METHOD_RATE)
+                self._methods[method] = TokenBucket(per_minute / 60., max(1., per_minute / 6.))
+            buckets.append(self._methods[method])
+        if channel:
+            if channel not in self._channels:
+                self._channels[channel] = TokenBucket(self.channel_rate, self.channel_burst)
+            buckets.append(self._channels[channel])
+        return buckets
+
+
+    def acquire(self, method:str=None, channel:str=None)->float:
+        ''' Blocks until the request is allowed by its method and channel buckets
+        Returns the number of seconds spent waiting
+        '''
+        start = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                buckets = self._buckets(method, channel)
+                wait = max([bucket.wait_time(now) for bucket in buckets], default=0.)
+                if wait <= 0:
+                    for bucket in buckets:
+                        bucket.take()
+                    return now - start
+            time.sleep(wait)
+
+
+    def pause(self, seconds:float, method:str=None, channel:str=None):
+        ''' Pauses the buckets of a rate limited request (e.g. from Retry-After) '''
+        with self._lock:
+            now = time.monotonic()
+            for bucket in self._buckets(method, channel):
+                bucket.pause(now, seconds)
+
+
+    def state(self)->dict:
+        ''' Current state of every bucket, to see how close we are to throttling '''
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "methods": {k: b.state(now) for k, b in self._methods.items()},
+                "channels": {k: b.state(now) for k, b in self._channels.items()},
+            }
@@ -0,0 +1,250 @@
+''' Local relay: a single per-host daemon delivering the messages of many processes
+
+Processes created with relay=True hand their (parsed) messages to the daemon over a
+Unix domain socket, instead of opening their own connections. The daemon batches,
+rate limits and delivers them with pooled connections. When the daemon is not
+running, messages are delivered directly, as without relay.
+
+Usage: python -m slackTools.relay [--socket PATH] [--keys FILE] [--batch-window S]
+'''
+# Standard Library
+import os
+import json
+import time
+import socket
+import tempfile
+import threading
+
+
+# Default socket, one per user, can be set with the SLACKTOOLS_RELAY environment variable
+def default_socket_path()->str:
+    return os.environ.get(
+        'SLACKTOOLS_RELAY',
+        os.path.join(tempfile.gettempdir(), f"slackTools-{os.getuid()}.sock"))
+
+
+class RelayClient:
+    ''' Connection of one process to the relay daemon
+    Safe to use after fork, each process opens its own connection.
+
+    var path:str = Unix socket of the daemon,
+    var retry_interval:float = seconds before trying again to connect after a failure
+    '''
+
+    def __init__(self, path:str=None, retry_interval:float=5.):
+        self.path = path or default_socket_path()
+        self.retry_interval = retry_interval
+        self._sock = None
+        self._pid = None
+        self._next_attempt = 0.
+        self._lock = threading.Lock()
+
+
+    def _connect(self)->bool:
+        ''' Connects if needed (lock held), returns False while the daemon is unavailable '''
+        if self._sock is not None and self._pid == os.getpid():
+            return True
+        self._sock = None
+        now = time.monotonic()
+        if now < self._next_attempt:
+            return False
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            self._next_attempt = now + self.retry_interval
+            return False
+        self._sock = sock
+        self._pid = os.getpid()
+        return True
+
+
+    def send(
+            self,
+            client:str,
+            token:str,
+            destination:str,
+            blocks:list,
+            attachments:list,
+            text:str
+        )->bool:
+        ''' Hands a parsed message to the daemon
+        Returns False if the daemon is unavailable, the message must then be sent directly
+        '''
+        line = json.dumps({
+            "client": client,
+            "token": token,
+            "destination": destination,
+            "blocks": blocks,
+            "attachments": attachments,
+            "text": text,
+        }).encode('utf-8') + b'\n'
+        with self._lock:
+            if not self._connect():
+                return False
+            try:
+                self._sock.sendall(line)
+                return True
+            except OSError:
+                self._sock.close()
+                self._sock = None
+                self._next_attempt = time.monotonic() + self.retry_interval
+                return False
+
+
+    def close(self):
+        with self._lock:
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
+
+
+class RelayServer:
+    ''' Relay daemon, delivers the messages received on a Unix socket
+    One client per token (webhook or bot) is created on first use, with batching,
+    rate limiting and a send queue, so connections and rate limits are shared
+    by every process of the host.
+
+    var path:str = Unix socket to listen on,
+    var filepath_slack_keys:str = keys file used by the daemon's clients,
+    var batch_window:float = seconds during which messages to the same destination are merged,
+    var verbose:bool = be verbose
+    '''
+
+    def __init__(
+            self,
+            path:str=None,
+            filepath_slack_keys:str=str(),
+            batch_window:float=1.,
+            verbose:bool=False
+        ):
+        self.path = path or default_socket_path()
+        self.filepath_slack_keys = filepath_slack_keys
+        self.batch_window = batch_window
+        self.verbose = verbose
+        self.received = 0
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._sock = None
+
+
+    def client(self, name:str, token:str):
+        ''' Returns the client delivering messages for a class name and token '''
+        key = (name, token)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    try:
+                        from .slackTools_bot import SlackTools_bot
+                        from .slackTools_webhook import SlackTools_webhook
+                    except ImportError:
+                        from slackTools_bot import SlackTools_bot
+                        from slackTools_webhook import SlackTools_webhook
+                    classes = {cls.RELAY_CLIENT: cls for cls in (SlackTools_bot, SlackTools_webhook)}
+                    if name not in classes:
+                        raise ValueError(f"<!> Unsupported relay client {name}")
+                    # Built outside the instance registry, so that a client of this
+                    # process (e.g. with relay set, or other options) is never reused
+                    client = object.__new__(classes[name])
+                    client.configure(
+                        self.filepath_slack_keys,
+                        token,
+                        notify_init_del=False,
+                        non_blocking=True,
+                        batch_window=self.batch_window,
+                        rate_limit=True,
+                        relay=False,
+                        verbose=self.verbose,
+                    )
+                    self._clients[key] = client
+        return client
+
+
+    def handle(self, line:bytes):
+        ''' Delivers one message received from a process '''
+        message = json.loads(line)
+        self.received += 1
+        client = self.client(message["client"], message["token"])
+        client._deliver(
+            message["destination"], message["blocks"], message["attachments"], message["text"])
+
+
+    def bind(self):
+        ''' Listens on the socket, replacing a stale one left by a previous daemon '''
+        if os.path.exists(self.path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+                raise RuntimeError(f"<!> A relay daemon is already listening on {self.path}")
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.unlink(self.path)
+            finally:
+                probe.close()
+
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Only the current user can connect
+        umask = os.umask(0o177)
+        try:
+            self._sock.bind(self.path)
+        finally:
+            os.umask(umask)
+        self._sock.listen(128)
+        return self
+
+
+    def serve_forever(self):
+        ''' Accepts connections, each one is read by its own thread '''
+        if self._sock is None:
+            self.bind()
+        print(f"SlackTools relay listening on {self.path}")
+        try:
+            while True:
+                conn, _ = self._sock.accept()
+                threading.Thread(target=self._read, args=(conn,), daemon=True).start()
+        except OSError:
+            # Closed by shutdown()
+            pass
+
+
+    def _read(self, conn:socket.socket):
+        with conn, conn.makefile('rb') as lines:
+            for line in lines:
+                try:
+                    self.handle(line)
+                except Exception as error:
+                    print(f"<?> Error relaying message to slack: {error}")
+
+
+    def shutdown(self):
+        ''' Stops listening and delivers the pending messages '''
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+        for client in list(self._clients.values()):
+            client.flush()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="SlackTools relay daemon")
+    parser.add_argument('--socket', default=None, help="Unix socket, see SLACKTOOLS_RELAY")
+    parser.add_argument('--keys', default=str(), help="Slack keys file")
+    parser.add_argument('--batch-window', type=float, default=1.)
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    # Deliver pending messages when stopped (e.g. by systemd or scancel)
+    import sys
+    import signal
+    signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+
+    server = RelayServer(args.socket, args.keys, args.batch_window, args.verbose)
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        server.shutdown()
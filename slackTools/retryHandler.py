@@ -1,5 +1,8 @@
 # Standard Library
+import time
 import socket
+import asyncio
+import threading
 from typing import Optional
 
 # Slack
@@ -8,19 +11,65 @@ from slack_sdk.http_retry.state import RetryState
 from slack_sdk.http_retry.request import HttpRequest
 from slack_sdk.http_retry.response import HttpResponse
 from slack_sdk.http_retry.handler import RetryHandler, default_interval_calculator
+from slack_sdk.http_retry.async_handler import AsyncRetryHandler
+
+
+def should_retry(
+    response: Optional[HttpResponse],
+    error: Optional[Exception],
+) -> bool:
+    ''' Retry policy shared by MyRetryHandler and MyAsyncRetryHandler '''
+    # Rate limited or server errors, other 4xx (e.g. invalid_blocks) would fail again
+    if response is not None and \
+        ( response.status_code == 429 or response.status_code >= 500 or \
+         (response.body or {}).get("error") == "fatal_error"):
+        return True
+    
+    if error is not None \
+        and isinstance(error, socket.error) \
+            and error.errno == 104:
+        # [Errno 104] Connection reset by peer
+        return True
+
+    return False
+
+
+def get_retry_after(response: Optional[HttpResponse]) -> Optional[float]:
+    ''' Returns the Retry-After of a 429 response in seconds, if any '''
+    if response is None or response.status_code != 429:
+        return None
+    for k, v in response.headers.items():
+        if k.lower() == "retry-after":
+            try:
+                return float(v[0] if isinstance(v, list) else v)
+            except ValueError:
+                return None
+    return None
 
 
 class MyRetryHandler(RetryHandler):
     ''' Handles retries for slack webhook 
     Ensures that slackTools does not crash your program if internet connection is lost.
+    Rate limited (429) requests wait for Retry-After instead of the backoff interval.
+
+    on_rate_limited = optional callable(request, retry_after) notified of 429 responses
     '''
     def __init__(
         self,
         max_retry_count: int = 3,
         interval_calculator: RetryIntervalCalculator = default_interval_calculator,
+        on_rate_limited = None,
     ):
         super().__init__(max_retry_count, interval_calculator)
         self.call_count = 0
+        self.on_rate_limited = on_rate_limited
+        self._local = threading.local()
+
+    def thread_retry_count(self) -> int:
+        ''' Retries made by the current thread, to attribute them to a call
+        Note, call_count also counts successful responses (can_retry sees every response)
+        '''
+        return getattr(self._local, "retry_count", 0)
 
     def _can_retry(
         self,
@@ -31,15 +80,67 @@ class MyRetryHandler(RetryHandler):
         error: Optional[Exception],
     ) -> bool:
         self.call_count += 1
-        if response is not None and \
-            ( response.status_code != 200 or \
-             response.body.get("error") == "fatal_error"):
-            return True
-        
-        if error is not None \
-            and isinstance(error, socket.error) \
-                and error.errno == 104:
-            # [Errno 104] Connection reset by peer
-            return True
-
-        return False
+        return should_retry(response, error)
+
+    def prepare_for_next_attempt(
+        self,
+        *,
+        state: RetryState,
+        request: HttpRequest,
+        response: Optional[HttpResponse] = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        self._local.retry_count = self.thread_retry_count() + 1
+        retry_after = get_retry_after(response)
+        if retry_after is None:
+            return super().prepare_for_next_attempt(
+                state=state, request=request, response=response, error=error)
+
+        if self.on_rate_limited is not None:
+            self.on_rate_limited(request, retry_after)
+        state.next_attempt_requested = True
+        time.sleep(retry_after)
+        state.increment_current_attempt()
+
+
+class MyAsyncRetryHandler(AsyncRetryHandler):
+    ''' asyncio counterpart of MyRetryHandler, for AsyncWebClient and AsyncWebhookClient '''
+    def __init__(
+        self,
+        max_retry_count: int = 3,
+        interval_calculator: RetryIntervalCalculator = default_interval_calculator,
+        on_rate_limited = None,
+    ):
+        super().__init__(max_retry_count, interval_calculator)
+        self.call_count = 0
+        self.on_rate_limited = on_rate_limited
+
+    async def _can_retry_async(
+        self,
+        *,
+        state: RetryState,
+        request: HttpRequest,
+        response: Optional[HttpResponse],
+        error: Optional[Exception],
+    ) -> bool:
+        self.call_count += 1
+        return should_retry(response, error)
+
+    async def prepare_for_next_attempt_async(
+        self,
+        *,
+        state: RetryState,
+        request: HttpRequest,
+        response: Optional[HttpResponse] = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        retry_after = get_retry_after(response)
+        if retry_after is None:
+            return await super().prepare_for_next_attempt_async(
+                state=state, request=request, response=response, error=error)
+
+        if self.on_rate_limited is not None:
+            self.on_rate_limited(request, retry_after)
+        state.next_attempt_requested = True
+        await asyncio.sleep(retry_after)
+        state.increment_current_attempt()
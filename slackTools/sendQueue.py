@@ -0,0 +1,149 @@
+# Standard Library
+import atexit
+import threading
+import time
+from collections import deque
+
+
+class SendQueue:
+    ''' Bounded in-process queue drained by a background delivery thread
+    Keeps slow Slack round trips (and their retries) off the caller's thread.
+
+    var maxsize:int = maximum number of pending sends,
+    var overflow:str = policy applied when the queue is full,
+        'block' waits for room,
+        'drop_oldest' discards the oldest pending send,
+        'drop_newest' discards the send being queued
+    var drain_timeout:float = seconds allowed to drain pending sends at interpreter exit
+    '''
+
+    OVERFLOW_POLICIES = ('block', 'drop_oldest', 'drop_newest')
+
+    def __init__(self, maxsize:int=1000, overflow:str='block', drain_timeout:float=10.):
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(
+                f"<!> Unknown overflow policy {overflow}. " \
+                + f"Please use one of {self.OVERFLOW_POLICIES}.")
+        if maxsize < 1:
+            raise ValueError("<!> SendQueue maxsize must be at least 1.")
+
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.drain_timeout = drain_timeout
+        self.dropped = 0
+
+        self._pending = deque()
+        self._local = threading.local()
+        self._unfinished = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._all_done = threading.Condition(self._lock)
+
+        self._thread = threading.Thread(
+            target=self._run, name=self.__class__.__name__, daemon=True)
+        self._thread.start()
+
+        # Drain before module teardown
+        atexit.register(self.close)
+
+
+    @property
+    def closed(self)->bool:
+        return self._closed
+
+
+    def wait_time(self)->float:
+        ''' Seconds the send being delivered spent in the queue,
+        0 when called outside of the delivery thread
+        '''
+        return getattr(self._local, 'wait', 0.)
+
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
+
+
+    def put(self, fn, *args, **kwargs)->bool:
+        ''' Queues fn(*args, **kwargs) for delivery
+        Returns False if the send was dropped (queue full or closed)
+        '''
+        with self._not_full:
+            if self._closed:
+                return False
+
+            if len(self._pending) >= self.maxsize:
+                if self.overflow == 'drop_newest':
+                    self.dropped += 1
+                    return False
+                elif self.overflow == 'drop_oldest':
+                    self._pending.popleft()
+                    self._unfinished -= 1
+                    self.dropped += 1
+                else:
+                    while len(self._pending) >= self.maxsize and not self._closed:
+                        self._not_full.wait()
+                    if self._closed:
+                        return False
+
+            self._pending.append((fn, args, kwargs, time.monotonic()))
+            self._unfinished += 1
+            self._not_empty.notify()
+        return True
+
+
+    def flush(self, timeout:float=None)->bool:
+        ''' Waits until every queued send has been delivered
+        var timeout:float = maximum seconds to wait, None waits forever
+        Returns True if the queue was fully drained
+        '''
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._all_done:
+            while self._unfinished:
+                if deadline is None:
+                    self._all_done.wait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._all_done.wait(remaining)
+        return True
+
+
+    def close(self, timeout:float=None)->bool:
+        ''' Stops accepting sends and drains the pending ones
+        var timeout:float = maximum seconds to wait, defaults to drain_timeout
+        Returns True if the queue was fully drained
+        '''
+        atexit.unregister(self.close)
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+        return self.flush(self.drain_timeout if timeout is None else timeout)
+
+
+    def _run(self):
+        ''' Delivery thread '''
+        while True:
+            with self._not_empty:
+                while not self._pending and not self._closed:
+                    self._not_empty.wait()
+                if not self._pending:
+                    return
+                fn, args, kwargs, queued = self._pending.popleft()
+                self._not_full.notify()
+
+            self._local.wait = time.monotonic() - queued
+            try:
+                fn(*args, **kwargs)
+            except Exception as error:
+                print(f"<?> Error delivering queued message to slack: {error}")
+            self._local.wait = 0.
+
+            with self._lock:
+                self._unfinished -= 1
+                if not self._unfinished:
+                    self._all_done.notify_all()
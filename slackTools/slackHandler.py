@@ -0,0 +1,130 @@
+# Standard Library
+import atexit
+import logging
+import threading
+
+
+class SlackHandler(logging.Handler):
+    ''' logging.Handler posting records to Slack
+    Records are aggregated over interval seconds and sent from a background thread
+    as a single message, repeated records (same logger, level and formatted message)
+    are merged into one line with their number of occurrences ("x37 occurrences").
+    @name mentions are resolved as in any other message.
+    Created by SlackTools.log_handler(...)
+
+    var slack:SlackTools_bot or SlackTools_webhook = client used to post,
+    var level:int = minimum level of the records sent,
+    var interval:float = seconds during which records are aggregated,
+    var max_lines:int = maximum number of distinct records per message, the rest are counted,
+    var destination = send_block arguments selecting where to post
+        (channel_name or channel_id for bots, webhook_token for webhooks)
+    '''
+
+    # Records from these loggers are ignored, they could be caused by the handler itself
+    IGNORED_LOGGERS = ("slack_sdk", "slackTools", "urllib3")
+
+    LEVEL_EMOJIS = {
+        logging.DEBUG: ":mag:",
+        logging.INFO: ":information_source:",
+        logging.WARNING: ":warning:",
+        logging.ERROR: ":x:",
+        logging.CRITICAL: ":rotating_light:",
+    }
+
+    def __init__(
+            self,
+            slack,
+            level:int=logging.WARNING,
+            interval:float=10.,
+            max_lines:int=40,
+            **destination
+        ):
+        super().__init__(level)
+        self.slack = slack
+        self.interval = interval
+        self.max_lines = max_lines
+        self.destination = destination
+        self._pending = {}
+        self._timer = None
+        self._pending_lock = threading.Lock()
+
+        # Registered after the client's, so runs before it stops sending
+        atexit.register(self.flush)
+
+
+    def filter(self, record:logging.LogRecord):
+        if record.name.split('.')[0] in self.IGNORED_LOGGERS:
+            return False
+        return super().filter(record)
+
+
+    def emit(self, record:logging.LogRecord):
+        ''' Aggregates a record, never blocks on Slack '''
+        try:
+            message = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+
+        # Only identical records are counted together, distinct messages from the
+        # same call site (e.g. f"job {i} failed") each get their own line
+        key = (record.name, record.levelno, message)
+        with self._pending_lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                self._pending[key] = [record, message, 1]
+            else:
+                entry[2] += 1
+            if self._timer is None:
+                self._timer = threading.Timer(self.interval, self._send)
+                self._timer.daemon = True
+                self._timer.start()
+
+
+    def flush(self):
+        ''' Sends the aggregated records now '''
+        self._send()
+
+
+    def close(self):
+        self.flush()
+        super().close()
+
+
+    def _lines(self, entries:list)->list:
+        lines = []
+        for record, message, count in entries[:self.max_lines]:
+            emoji = self.LEVEL_EMOJIS.get(record.levelno, "")
+            line = f"{emoji} *{record.levelname}* `{record.name}` {message}"
+            if '\n' in message:
+                # Tracebacks and other multi-line messages
+                first, rest = message.split('\n', 1)
+                line = f"{emoji} *{record.levelname}* `{record.name}` {first}\n```{rest}```"
+            if count > 1:
+                line += f" _(x{count} occurrences)_"
+            lines.append(line)
+        if len(entries) > self.max_lines:
+            others = sum(count for _, _, count in entries[self.max_lines:])
+            lines.append(f"_... and {others} more records_")
+        return lines
+
+
+    def _send(self):
+        with self._pending_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            entries, self._pending = list(self._pending.values()), {}
+        if not entries:
+            return
+
+        blocks = [
+            {"type": "section", "text": {"type": "mrkdwn", "text": line}}
+            for line in self._lines(entries)
+        ]
+        first = entries[0]
+        text = f"{first[0].levelname}: {first[1].split(chr(10))[0]}"
+        try:
+            self.slack.send_block(blocks=blocks, text=text, **self.destination)
+        except Exception as error:
+            print(f"<?> Error sending log records to slack: {error}")
@@ -1,25 +1,113 @@
 # Standard
-import re
+import os
+import sys
+import json
+import time
+import atexit
+import logging
 import socket
-from random_word import RandomWords
+import threading
 
 # Custom
 try:
     from . import keys
+    from .sendQueue import SendQueue
+    from .tagResolver import TagResolver
+    from .messageBatcher import MessageBatcher
+    from .rateLimiter import RateLimiter
+    from .outbox import Outbox, is_transient
+    from .metrics import Metrics
+    from .payloadGuard import check_message, split_message, MAX_PARTS, MAX_PAYLOAD_BYTES
+    from .relay import RelayClient
+    from .duplicateFilter import DuplicateFilter
+    from .blocks.model import BlockObject
 except:
     import keys
+    from sendQueue import SendQueue
+    from tagResolver import TagResolver
+    from messageBatcher import MessageBatcher
+    from rateLimiter import RateLimiter
+    from outbox import Outbox, is_transient
+    from metrics import Metrics
+    from payloadGuard import check_message, split_message, MAX_PARTS, MAX_PAYLOAD_BYTES
+    from relay import RelayClient
+    from duplicateFilter import DuplicateFilter
+    from blocks.model import BlockObject
+
+# Outbox file, stored next to the keys file
+OUTBOX_FILENAME = '.slack.outbox.sqlite'
+
+# Seconds between attempts to send the outbox while messages are waiting
+OUTBOX_RETRY_INTERVAL = 30.
+
+# Seconds allowed for lifecycle notifications (and pending messages) at exit
+NOTIFY_TIMEOUT = 5.
+
+# Composition objects with a text field and no nested blocks
+TEXT_OBJECT_TYPES = ("mrkdwn", "plain_text")
+
 
 class SlackTools:
     ''' Slack Class Encompasses config for interacting with slack and
     encapsulates basic routines
     '''
 
-    _instance_SlackTools = None
+    # Client name understood by the relay daemon, None if relay is not supported
+    RELAY_CLIENT = None
+
+    # Options of configure a subclass cannot honour, rejected when enabled
+    UNSUPPORTED_OPTIONS = ()
+
+    # Instances shared by class, keys file (workspace) and token, see __new__
+    _instances = {}
+    _instances_lock = threading.RLock()
+
     def __new__(cls, *args, **kwargs):
-        if cls._instance_SlackTools is None:
-            cls._instance_SlackTools = super(SlackTools, cls).__new__(cls)
-            cls._instance_SlackTools.configure(*args, **kwargs)
-        return cls._instance_SlackTools
+        ''' Returns the instance for the given keys file and token, creating it on first use
+        Each instance has its own clients, connection pool, rate limiter and queues,
+        so several workspaces and tokens can be used concurrently from one process.
+        Later calls with the same keys file and token return the same instance,
+        with a warning if they ask for other options.
+        '''
+        options = cls._options(args, kwargs)
+        config = keys.load(options['filepath_slack_keys'], verbose=options['verbose'])
+        key = (cls, os.path.abspath(config.path), cls._resolve_token(config, options['slack_token']))
+
+        with cls._instances_lock:
+            instance = SlackTools._instances.get(key)
+            if instance is None:
+                instance = super(SlackTools, cls).__new__(cls)
+                instance.configure(*args, **kwargs)
+                instance._options = options
+                SlackTools._instances[key] = instance
+                return instance
+
+        ignored = [
+            f"{name}={value!r}" for name, value in options.items()
+            if name not in ('filepath_slack_keys', 'slack_token')
+            and value != instance._options.get(name)
+        ]
+        if ignored:
+            print(f"<?> Warning, a {cls.__name__} already exists for {config.path} and this token," \
+                + f" keeping its options (ignored: {', '.join(ignored)}).")
+        return instance
+
+
+    @classmethod
+    def _options(cls, args:tuple, kwargs:dict)->dict:
+        ''' Returns every configure argument of a call, defaults included '''
+        code = cls.configure.__code__
+        names = code.co_varnames[1:code.co_argcount]
+        options = dict(zip(names, cls.configure.__defaults__))
+        options.update(zip(names, args))
+        options.update(kwargs)
+        return options
+
+
+    @classmethod
+    def _resolve_token(cls, config:keys.KeyConfig, slack_token:str=str())->str:
+        ''' Returns the token an instance would use, to identify it in the registry '''
+        return slack_token
 
 
     def configure(
@@ -30,6 +118,18 @@ class SlackTools:
             slack_default_channel_name:str=str(),
             hostname:str=str(),
             notify_init_del:bool=True,
+            notify_timeout:float=NOTIFY_TIMEOUT,
+            non_blocking:bool=False,
+            queue_size:int=1000,
+            queue_overflow:str='block',
+            batch_window:float=0.,
+            rate_limit:bool=False,
+            outbox:bool=False,
+            outbox_max_entries:int=10000,
+            metrics=None,
+            relay=False,
+            dedup_ttl:float=0.,
+            dedup_max_entries:int=1024,
             verbose:bool=False
         ):
         ''' Initializes SlackTools
@@ -43,14 +143,83 @@ class SlackTools:
             if None then it will be kept blank
 
         notify_init_del:bool = whether to notify on initialization and destruction,
+        notify_timeout:float = seconds allowed at exit to send pending messages and the
+            termination notification, notifications never block the caller,
+        non_blocking:bool = deliver messages from a background thread instead of the caller's,
+        queue_size:int = maximum number of pending messages when non_blocking,
+        queue_overflow:str = policy when the queue is full ('block', 'drop_oldest' or 'drop_newest'),
+        batch_window:float = seconds during which messages to the same channel (or webhook)
+            are merged into a single post, 0 disables batching,
+        rate_limit:bool = schedule requests with per channel and per API method token buckets,
+        outbox:bool = keep messages that could not be delivered (e.g. no WAN) on disk,
+            next to the keys file, and send them once connectivity returns,
+        outbox_max_entries:int = maximum number of messages kept in the outbox,
+        metrics = hook called with a record (dict) after each message or file is sent,
+            e.g. a Metrics instance, True creates one (see self.metrics),
+        relay = hand messages to the local relay daemon (python -m slackTools.relay) when
+            it is running, True for the default socket or the path of its socket,
+        dedup_ttl:float = seconds during which a message identical to one already sent
+            (to the same destination) is suppressed and only counted, 0 disables it,
+        dedup_max_entries:int = maximum number of recent messages remembered for dedup_ttl,
         verbose:bool = be verbose
         '''
-        
+        options = locals()
+        unsupported = [name for name in self.UNSUPPORTED_OPTIONS if options[name]]
+        if unsupported:
+            raise ValueError(
+                f"<!> {self.__class__.__name__} does not support {', '.join(unsupported)}." \
+                + " Please use SlackTools_bot or SlackTools_webhook.")
+
         self.verbose = verbose
 
+        # Instrumentation
+        self.metrics = Metrics() if metrics is True else (metrics or None)
+
+        # Background delivery
+        self.send_queue = None
+        if non_blocking:
+            self.send_queue = SendQueue(
+                maxsize=queue_size, overflow=queue_overflow, drain_timeout=notify_timeout)
+
+        # Message coalescing
+        self.batcher = None
+        if batch_window > 0:
+            self.batcher = MessageBatcher(
+                lambda *message: self._dispatch(self._send, *message), window=batch_window)
+
+        # Duplicate suppression, summaries bypass it
+        self.dedup = None
+        if dedup_ttl > 0:
+            self.dedup = DuplicateFilter(
+                self._deliver_one, ttl=dedup_ttl, max_entries=dedup_max_entries)
+
+        # Delivery through the relay daemon
+        self.relay = None
+        if relay and self.RELAY_CLIENT:
+            self.relay = RelayClient(None if relay is True else relay)
+
+        # Rate limiting
+        self.rate_limiter = RateLimiter() if rate_limit else None
+
         # Load keys
         self.filepath_slack_keys = filepath_slack_keys
-        self.config = keys.load(filepath_slack_keys, verbose=verbose)
+        self._config = keys.load(filepath_slack_keys, verbose=verbose)
+        self._config_checked = time.monotonic()
+        self._tag_resolver = None
+
+        # Durable outbox
+        self.outbox = None
+        if outbox:
+            # Shared by the clients using the same keys file, each replays its own messages
+            self.outbox = Outbox(
+                os.path.join(
+                    os.path.dirname(os.path.abspath(self._config.path)),
+                    OUTBOX_FILENAME),
+                client=self.__class__.__name__,
+                token=self._resolve_token(self._config, slack_token),
+                max_entries=outbox_max_entries)
+            self._replay_lock = threading.Lock()
+            self._replay_timer = None
 
         # Set hostname for instance
         if hostname and hostname != 'rnd':
@@ -58,6 +227,7 @@ class SlackTools:
         elif hostname == '':
             self.hostname=socket.gethostname()
         elif hostname == 'rnd':
+            from random_word import RandomWords
             self.hostname = RandomWords().get_random_word()
         else:
             self.hostname = str()
@@ -71,19 +241,30 @@ class SlackTools:
 
         # Default notification string
         self.notify = ''
-        for user in self.config['SLACK_NOTIFICATION']['NOTIFY_ON_EVENT']:
+        for user in self.config.notify:
             self.notify += f" {user}"
         self.notify = self.notify.strip()
 
         # Notify of initialization
         self.notify_init_del = verbose or notify_init_del
+        self.notify_timeout = notify_timeout
+        self._notify_threads = []
+        self._terminated = False
         if self.notify_init_del:
             message = f"{self.__class__.__name__} was initialized " \
                     f"{'as '+self.hostname if self.hostname else ''} {self.notify}"
             if self.__class__.__name__ != SlackTools.__name__:
-                self.send_markdown(message)
+                self._notify_event(message)
             print(message)
 
+        # Runs before module teardown, and before the send queue and outbox
+        # are closed (atexit callbacks run in reverse order of registration)
+        atexit.register(self._at_exit)
+
+        # Send what previous runs could not, once the client is ready
+        if self.outbox is not None:
+            self.replay_outbox(background=True)
+
 
     def init_slack(self, *args):
         ''' Initializes SlackTools config for interacting with slack'''
@@ -96,71 +277,148 @@ class SlackTools:
     def __del__(self):
         ''' Notify of destruction '''
 
-        if self.notify_init_del:
-            message = f"{self.__class__.__name__} instance" \
-                f"{self.hostname+' ' if self.hostname else ''} was terminated {self.notify}"
-            if self.__class__.__name__ != SlackTools.__name__:
-                self.send_markdown(str(message))
-            print(message)
+        # Already notified at exit, and no network I/O during interpreter shutdown
+        # (notify_init_del is missing if configure raised)
+        if getattr(self, 'notify_init_del', False) and not self._terminated and not sys.is_finalizing():
+            self._notify_terminated()
 
 
-    def parse_tags(self, blocks):
-        ''' Parses @name tags and replaces them with the corresponding slack ID'''
-        # Regular expression for @name
-        expr = r' @([^ ]*)'
+    def _notify_terminated(self):
+        ''' Sends the termination notification '''
+        self._terminated = True
+        message = f"{self.__class__.__name__} instance" \
+            f"{self.hostname+' ' if self.hostname else ''} was terminated {self.notify}"
+        if self.__class__.__name__ != SlackTools.__name__:
+            self._notify_event(str(message))
+        print(message)
 
-        def lookup(name):
-            ''' Returns the corresponding slack ID'''
-            if name in self.config['SLACK_USERS']:
-                return self.config['SLACK_USERS'][name]
 
+    def _at_exit(self):
+        ''' Sends the termination notification and pending messages,
+        giving up after notify_timeout seconds so that exit never hangs on the network
+        '''
+        deadline = time.monotonic() + self.notify_timeout
+        if self.notify_init_del and not self._terminated:
+            self._notify_terminated()
+        for thread in self._notify_threads:
+            thread.join(max(0., deadline - time.monotonic()))
+
+        # Summaries, batched messages and the send queue are drained here, within the
+        # deadline, instead of by their own atexit callbacks
+        if self.batcher is not None:
+            atexit.unregister(self.batcher.flush)
+        if self.send_queue is not None:
+            atexit.unregister(self.send_queue.close)
+
+        def drain():
+            try:
+                if self.dedup is not None:
+                    self.dedup.flush()
+                if self.batcher is not None:
+                    self.batcher.flush()
+                if self.send_queue is not None:
+                    self.send_queue.close(timeout=max(0., deadline - time.monotonic()))
+            except Exception as error:
+                print(f"<?> Error sending message to slack: {error}")
+        # Sends without a queue are synchronous, they are given up at the deadline
+        thread = threading.Thread(target=drain, daemon=True)
+        thread.start()
+        thread.join(max(0., deadline - time.monotonic()))
+        if thread.is_alive():
+            print("<?> SlackTools gave up sending pending messages at exit (notify_timeout)")
+
+
+    def _notify_event(self, message:str):
+        ''' Sends an initialization/termination notification from a daemon thread
+        The caller does not wait for Slack, pending notifications are awaited at exit
+        '''
+        self._notify_threads = [t for t in self._notify_threads if t.is_alive()]
+        thread = threading.Thread(target=self._send_notification, args=(message,), daemon=True)
+        thread.start()
+        self._notify_threads.append(thread)
+
+
+    def _send_notification(self, message:str):
+        ''' Delivers a lifecycle notification (runs on a notification thread) '''
+        self.send_markdown(message)
+
+
+    @property
+    def config(self)->keys.KeyConfig:
+        ''' Keys config, reloaded when the keys file changes (checked every RELOAD_INTERVAL s) '''
+        now = time.monotonic()
+        if now - self._config_checked >= keys.RELOAD_INTERVAL:
+            self._config_checked = now
+            try:
+                self._config = keys.load(self._config.path)
+            except Exception as error:
+                print(f"<?> Failed to reload Slack keys, keeping the previous ones: {error}")
+        return self._config
+
+
+    @property
+    def tag_resolver(self)->TagResolver:
+        ''' Compiled @name resolver, rebuilt when SLACK_USERS changes '''
+        users = self.config.users
+        if self._tag_resolver is None or self._tag_resolver.source is not users:
+            fallback = None
             if self.verbose:
-                return f"{name} ({self.__class__.__name__}: " \
+                fallback = lambda name: f"{name} ({self.__class__.__name__}: " \
                     + f"This person is not in the config file ({self.filepath_slack_keys}... )"
+            self._tag_resolver = TagResolver(users, fallback=fallback)
+        return self._tag_resolver
+
+
+    def parse_tags(self, blocks):
+        ''' Parses @name tags and replaces them with the corresponding slack ID'''
+        resolve = self.tag_resolver.resolve
+        if isinstance(blocks, str):
+            return resolve(blocks)
+
+        # Iterate through blocks, only descending into containers
+        hostname = self.hostname
+        warn = self.verbose
+        # Block Kit objects are serialized in place, resolving their texts in the same pass
+        transform = (lambda text: f"{hostname} :: {resolve(text)}") if hostname else resolve
+        stack = [blocks]
+        push, pop = stack.append, stack.pop
+        while stack:
+            node = pop()
+            if isinstance(node, dict):
+                text = node.get("text")
+                if isinstance(text, str):
+                    text = resolve(text)
+                    node["text"] = f"{hostname} :: {text}" if hostname else text
+                    if warn and "type" in node and node['type'] != "mrkdwn":
+                        print("<?> Warning, Slack @name references only work when text type is mrkdwn")
+                        # Danger! Do not send as a message, as this will cause an infinite loop
+                    if node.get("type") in TEXT_OBJECT_TYPES:
+                        # Text objects hold no nested blocks
+                        continue
+                for key, value in node.items():
+                    if isinstance(value, (dict, list)):
+                        push(value)
+                    elif isinstance(value, BlockObject):
+                        node[key] = value.to_dict(transform)
+            elif isinstance(node, list):
+                for i, value in enumerate(node):
+                    if isinstance(value, (dict, list)):
+                        push(value)
+                    elif isinstance(value, BlockObject):
+                        node[i] = value.to_dict(transform)
 
-            # Return unmodified.
-            # Fallback for when the user is not in the config file.
-            return f" @{name}"
-
-        # Recursive through blocks
-        if isinstance(blocks, list):
-            for b in blocks:
-                self.parse_tags(b)
-
-        elif isinstance(blocks, dict):
-            if "text" in blocks.keys() and isinstance(blocks["text"], str):
-                blocks["text"] = re.sub(
-                    expr,
-                    lambda m: lookup(m.group(1)),
-                    blocks["text"]
-                )
-                if self.hostname:
-                    blocks["text"] = f"{self.hostname} :: {blocks['text']}"
-                if self.verbose and "type" in blocks.keys() and blocks['type'] != "mrkdwn":
-                    print("<?> Warning, Slack @name references only work when text type is mrkdwn")
-                    # Danger! Do not send as a message, as this will cause an infinite loop
-            for k in blocks.keys():
-                if isinstance(blocks[k], list) or isinstance(blocks[k], dict):
-                    self.parse_tags(blocks[k])
-
-        elif isinstance(blocks, str):
-            return re.sub(
-                    expr,
-                    lambda m: lookup(m.group(1)),
-                    blocks
-                )
 
     def msg(self, text:str):
         ''' Convenience overload for send_message(...) '''
-        self.send_message(message=text)
+        return self.send_message(message=text)
 
     def write(self, markdown:str):
         '''Convenience overload for send_markdown(...) '''
-        self.send_markdown(message=markdown)
+        return self.send_markdown(message=markdown)
 
-    def upload(self, file:str):
-        '''Convenience overload for send_file(...) '''
-        self.send_file(filepath=file)
+    def upload(self, file):
+        '''Convenience overload for send_file(...), file is a path, bytes, a binary file or a figure '''
+        return self.send_file(filepath=file)
 
 
     def send_message(self, message:str):
@@ -189,21 +447,301 @@ class SlackTools:
                 + "Please use SlackTools_bot or SlackTools_webhook.")
 
 
+    def flush(self, timeout:float=None)->bool:
+        ''' Sends batched messages and waits for queued ones to be delivered
+        var timeout:float = maximum seconds to wait, None waits forever
+        Returns True if every queued message was delivered
+        '''
+        if self.dedup is not None:
+            self.dedup.flush()
+        if self.batcher is not None:
+            self.batcher.flush()
+        if self.send_queue is None:
+            return True
+        return self.send_queue.flush(timeout)
+
+
+    def log_handler(
+            self,
+            level:int=logging.WARNING,
+            interval:float=10.,
+            max_lines:int=40,
+            **destination
+        ):
+        ''' Returns a logging.Handler posting log records to Slack
+        Records are aggregated and sent once every interval seconds from a background
+        thread, repeated records are counted instead of being posted again.
+        var level:int = minimum level of the records sent,
+        var interval:float = seconds during which records are aggregated,
+        var max_lines:int = maximum number of distinct records per message,
+        var destination = channel_name or channel_id (bot), webhook_token (webhook)
+        Usage:
+            logging.getLogger().addHandler(slack.log_handler(logging.WARNING))
+        '''
+        try:
+            from .slackHandler import SlackHandler
+        except ImportError:
+            from slackHandler import SlackHandler
+        return SlackHandler(self, level=level, interval=interval, max_lines=max_lines, **destination)
+
+
+    def send_table(
+            self,
+            data,
+            title:str=str(),
+            columns:list=None,
+            float_format:str='.4g',
+            layout:str='code',
+            **destination
+        ):
+        ''' Posts a table (pandas DataFrame, dict of columns, NumPy array or list of rows)
+        Numbers are formatted once per column, the table is laid out in monospace code
+        blocks (or section fields) and split across messages if needed. Tables that would
+        take more than MAX_PARTS messages are uploaded as a CSV file instead (bot only).
+        var title:str = header of the table, and name of the CSV file,
+        var columns:list = column names, replacing those of data,
+        var float_format:str = format spec of floating point numbers (e.g. '.3f'),
+        var layout:str = 'code' or 'fields' (two columns), see blocks.Table,
+        var destination = channel_name or channel_id (bot), webhook_token (webhook)
+        '''
+        try:
+            from .blocks.table import Table
+        except ImportError:
+            from blocks.table import Table
+
+        table = Table(data, columns=columns, float_format=float_format)
+        text = title or f"Table of {table.rows} rows"
+        if table.text_size() > MAX_PARTS * MAX_PAYLOAD_BYTES and hasattr(self, '_post_content'):
+            try:
+                channel_id = self.check_channel(**destination)
+            except Exception as error:
+                print(f"<?> Error uploading table to slack: {error}")
+                return -1
+            filename = f"{(title or 'table').replace('/', '_')}.csv"
+            return self._dispatch(
+                self._send_content, channel_id, table.csv(), filename, self.parse_tags(text))
+        return self.send_block(blocks=table.blocks(title, layout), text=text, **destination)
+
+
+    def _deliver(self, destination:str, blocks:list, attachments:list, text:str):
+        ''' Hands a parsed message to the batcher, the send queue or _send
+        Messages exceeding Slack's limits are split in several messages, or uploaded
+        as a text file when that would take more than MAX_PARTS messages or a single
+        block is too large (bot only).
+        Duplicates of a recent message are dropped when dedup_ttl is set.
+        '''
+        if self.dedup is not None and not self.dedup.check(destination, blocks, attachments, text):
+            return None
+        if check_message(blocks, attachments, text) is None:
+            messages = split_message(blocks, attachments, text)
+            if (messages is None or len(messages) > MAX_PARTS) and hasattr(self, '_post_snippet'):
+                return self._dispatch(self._send_snippet, destination, blocks, attachments, text)
+            if messages is None:
+                print("<?> Error sending message to slack: a block is larger than" \
+                    + f" {MAX_PAYLOAD_BYTES} bytes, Slack would reject it")
+                return -1
+            results = [self._deliver_one(destination, *message) for message in messages]
+            return -1 if -1 in results else None
+        return self._deliver_one(destination, blocks, attachments, text)
+
+
+    def _deliver_one(self, destination:str, blocks:list, attachments:list, text:str):
+        ''' Hands a message within Slack's limits to the relay daemon, the batcher,
+        the send queue or _send
+        '''
+        if self.relay is not None and self.relay.send(
+                self.RELAY_CLIENT, self.slack_token, destination, blocks, attachments, text):
+            return None
+        if self.batcher is not None:
+            return self.batcher.add(destination, blocks, attachments, text)
+        return self._dispatch(self._send, destination, blocks, attachments, text)
+
+
+    def _send(self, destination:str, blocks:list, attachments:list, text:str):
+        ''' Posts a parsed message, keeping it in the outbox if it cannot be delivered '''
+        if self.outbox is not None and len(self.outbox):
+            # Keep messages in order, behind those waiting in the outbox
+            self.outbox.append(destination, blocks, attachments, text)
+            self.replay_outbox()
+            return None
+
+        try:
+            self._post_recorded(destination, blocks, attachments, text)
+        except Exception as error:
+            print(f"<?> Error sending message to slack: {error}")
+            if self.outbox is not None and is_transient(error):
+                self.outbox.append(destination, blocks, attachments, text)
+                self._schedule_replay()
+            return -1
+
+
+    def _post_recorded(self, destination:str, blocks:list, attachments:list, text:str):
+        ''' _post, recorded by the metrics hook (raises on failure) '''
+        return self._recorded(
+            "message", destination, self._message_size(blocks, attachments, text),
+            self._post, destination, blocks, attachments, text)
+
+
+    def _send_snippet(self, destination:str, blocks:list, attachments:list, text:str):
+        ''' Uploads a message too long to be posted as a text file '''
+        try:
+            self._recorded(
+                "file", destination, self._message_size(blocks, attachments, text),
+                self._post_snippet, destination, blocks, attachments, text)
+        except Exception as error:
+            print(f"<?> Error uploading message to slack as a file: {error}")
+            return -1
+
+
+    def _send_content(self, destination:str, content:bytes, filename:str, comment:str):
+        ''' Uploads in-memory content as a file '''
+        try:
+            self._recorded(
+                "file", destination, len(content),
+                self._post_content, destination, content, filename, comment)
+        except Exception as error:
+            print(f"<?> Error uploading {filename} to slack: {error}")
+            return -1
+
+
+    def _recorded(self, kind:str, destination:str, size:int, fn, *args, **kwargs):
+        ''' Calls fn(*args, **kwargs), recorded by the metrics hook if any
+        Returns the response of fn, its exceptions are re-raised once recorded
+        '''
+        if self.metrics is None:
+            return fn(*args, **kwargs)
+        record = self._start_record(kind, destination, size)
+        try:
+            response = fn(*args, **kwargs)
+        except Exception as error:
+            self._finish_record(record, error=error)
+            raise
+        self._finish_record(record, response=response)
+        return response
+
+
+    def _message_size(self, blocks:list, attachments:list, text:str)->int:
+        ''' Serialized size of a message, only computed for the metrics hook '''
+        if self.metrics is None:
+            return 0
+        return len(json.dumps({"blocks": blocks, "attachments": attachments, "text": text}))
+
+
+    def _start_record(self, kind:str, destination:str, size:int)->dict:
+        ''' Starts a metrics record for a send, see metrics.Metrics for its fields '''
+        return {
+            "kind": kind,
+            "destination": destination,
+            "seconds": time.perf_counter(),
+            "queue_wait": self.send_queue.wait_time() if self.send_queue is not None else 0.,
+            "bytes": size,
+            "retries": self._retry_count(destination),
+            "status": None,
+            "ok": False,
+            "error": None,
+        }
+
+
+    def _finish_record(self, record:dict, response=None, error:Exception=None):
+        ''' Completes a metrics record and hands it to the metrics hook '''
+        record["seconds"] = time.perf_counter() - record["seconds"]
+        record["retries"] = self._retry_count(record["destination"]) - record["retries"]
+        if error is not None:
+            response = getattr(error, 'response', None)
+            record["error"] = str(error)
+        record["status"] = getattr(response, 'status_code', None)
+        record["ok"] = error is None
+        try:
+            self.metrics(record)
+        except Exception as hook_error:
+            print(f"<?> Error in SlackTools metrics hook: {hook_error}")
+
+
+    def _retry_count(self, destination:str)->int:
+        ''' Retries made so far by the current thread for a destination '''
+        return sum(
+            handler.thread_retry_count() for handler in self._retry_handlers(destination)
+            if hasattr(handler, 'thread_retry_count'))
+
+
+    def _retry_handlers(self, destination:str)->list:
+        ''' Retry handlers of the client used for a destination '''
+        return []
+
+
+    def replay_outbox(self, background:bool=False)->int:
+        ''' Sends the messages waiting in the outbox, in order
+        var background:bool = send from a background thread and return immediately
+        Returns the number of messages delivered
+        '''
+        if self.outbox is None:
+            return 0
+        if background:
+            threading.Thread(target=self.replay_outbox, daemon=True).start()
+            return 0
+
+        # Only one replay at a time, a running replay will send new messages too
+        if not self._replay_lock.acquire(blocking=False):
+            return 0
+        try:
+            delivered = self.outbox.replay(self._post_recorded)
+        finally:
+            self._replay_lock.release()
+        if len(self.outbox):
+            self._schedule_replay()
+        return delivered
+
+
+    def _schedule_replay(self):
+        ''' Tries the outbox again later, until it is empty '''
+        if self._replay_timer is None or not self._replay_timer.is_alive():
+            self._replay_timer = threading.Timer(OUTBOX_RETRY_INTERVAL, self.replay_outbox)
+            self._replay_timer.daemon = True
+            self._replay_timer.start()
+
+
+    def _rate_limit_keys(self, request)->tuple:
+        ''' Returns the (API method, channel) of a request, for the rate limiter '''
+        return request.url.rsplit('/', 1)[-1], None
+
+
+    def _on_rate_limited(self, request, retry_after:float):
+        ''' Pauses the rate limiter bucket concerned by a 429 response '''
+        if self.rate_limiter is None:
+            return
+        method, channel = self._rate_limit_keys(request)
+        if channel:
+            self.rate_limiter.pause(retry_after, channel=channel)
+        else:
+            self.rate_limiter.pause(retry_after, method=method)
+
+
+    def _dispatch(self, fn, *args, **kwargs):
+        ''' Calls fn(*args, **kwargs) now, or queues it when non_blocking '''
+        if self.send_queue is not None and not self.send_queue.closed:
+            if not self.send_queue.put(fn, *args, **kwargs):
+                print("<?> SlackTools send queue is full, message was dropped")
+                return -1
+            return None
+        return fn(*args, **kwargs)
+
+
     def check_channel(self, channel_id:str=str(), channel_name:str=str())->str:
         ''' Converts a the slack channel name to a slack channel ID using keys config '''
 
         if channel_name:
-            if channel_name in self.config['SLACK_CHANNEL']:
-                return self.config['SLACK_CHANNEL'][channel_name]
+            channels = self.config.channels
+            if channel_name in channels:
+                return channels[channel_name]
             else:
-                raise f"<!> Slack channel name {channel_name} is unrecognized and " \
+                raise KeyError(f"<!> Slack channel name {channel_name} is unrecognized and " \
                     + "cannot be converted to a channel ID. Please add it to the " \
-                    + "config file ({filepath_slack_keys}) or use the channel_id instead."
+                    + f"config file ({self._config.path}) or use the channel_id instead.")
         elif channel_id: # Not None
             return channel_id # No conversion necessary
         else:
             # Return default
-            return self.config['SLACK_CHANNEL']['SLACK_DEFAULT_CHANNEL_ID']
+            return self.config.channels['SLACK_DEFAULT_CHANNEL_ID']
 
 
     def check_WAN(self, host="8.8.8.8", port=53, timeout=3):
@@ -1,26 +1,35 @@
-# Slack
-from slack_sdk.web import WebClient
-from slack_sdk.http_retry.jitter import RandomJitter
-from slack_sdk.http_retry.builtin_interval_calculators import BackoffRetryIntervalCalculator
+# Standard Library
+import os
+import re
+import json
+import threading
+from urllib.parse import parse_qs
 
 # Custom
+# Note, slack_sdk and the modules depending on it are imported on first use
+# to keep `import slackTools` fast (see benchmarks/bench_import.py)
 try:
     from .slackTools import SlackTools
-    from .retryHandler import MyRetryHandler
 except:
     from slackTools import SlackTools
-    from retryHandler import MyRetryHandler
 
 
 ## BOT_TOKEN ##
 
+# Slack channel IDs (public, private and direct message channels)
+CHANNEL_ID = re.compile(r'^[CDG][A-Z0-9]{8,}$')
+
 class SlackTools_bot(SlackTools):
     '''Uses SLACK_BOT_TOKEN 
     Offers more universal access (can post to different channels)'''
     
-    _instance_SlackTools_bot = None
+    # Files shared per files.completeUploadExternal call
+    MAX_FILES_PER_SHARE = 10
+
+    RELAY_CLIENT = 'SlackTools_bot'
+
     def __new__(cls, *args, **kwargs):
-        ''' Initializes SlackTools_webhook
+        ''' Initializes SlackTools_webhook, or returns the existing instance for the same keys file and token
         var slack_token:str = slack API token,
         var slack_default_channel_id:str = ID of the slack channel to use as the default channel,
         var slack_default_channel_name:str = name of the default slack channel,
@@ -30,11 +39,24 @@ class SlackTools_bot(SlackTools):
             if '' then it will be kept blank
 
         notify_init_del:bool = whether to notify on initialization and destruction,
+        notify_timeout:float = seconds allowed at exit for pending messages and notifications,
+        non_blocking:bool = deliver messages from a background thread instead of the caller's,
+        queue_size:int = maximum number of pending messages when non_blocking,
+        queue_overflow:str = policy when the queue is full ('block', 'drop_oldest' or 'drop_newest'),
+        batch_window:float = seconds during which messages to the same destination are merged,
+        rate_limit:bool = schedule requests with per channel and per API method token buckets,
+        outbox:bool = keep undelivered messages on disk and send them once connectivity returns,
+        outbox_max_entries:int = maximum number of messages kept in the outbox,
+        metrics = hook called with a record (dict) after each send, e.g. a Metrics instance or True,
+        relay = hand messages to the local relay daemon when running, True or its socket path,
         verbose:bool = be verbose
         '''
-        if cls._instance_SlackTools_bot is None:
-            cls._instance_SlackTools_bot = super(SlackTools_bot, cls).__new__(cls,*args, **kwargs)
-        return cls._instance_SlackTools_bot
+        return super(SlackTools_bot, cls).__new__(cls, *args, **kwargs)
+
+
+    @classmethod
+    def _resolve_token(cls, config, slack_token:str=str())->str:
+        return slack_token or config['SLACK_BOT'].get('TOKEN')
 
 
     def init_slack(
@@ -55,8 +77,43 @@ class SlackTools_bot(SlackTools):
         self.slack_default_channel_id = self.check_channel(
             slack_default_channel_id, slack_default_channel_name)
 
-        # Initialize the client
-        self.client = WebClient(
+        # The client is created on first use
+        self._client = None
+        self._client_lock = threading.Lock()
+        if self.verbose:
+            self._auth_test()
+
+
+    def _auth_test(self):
+        ''' Prints the result of an authentication test '''
+        result = self.client.auth_test()
+        print(
+            f"{self.__class__.__name__} authentication test:\n" \
+            + f"{result}"
+        )
+
+
+    @property
+    def client(self):
+        ''' Slack WebClient, created on first use '''
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+
+    def _create_client(self):
+        ''' Initializes the client '''
+        from slack_sdk.web import WebClient
+        from slack_sdk.http_retry.jitter import RandomJitter
+        from slack_sdk.http_retry.builtin_interval_calculators import BackoffRetryIntervalCalculator
+        try:
+            from .retryHandler import MyRetryHandler
+        except ImportError:
+            from retryHandler import MyRetryHandler
+
+        return WebClient(
             self.slack_token,
             retry_handlers=[
                 MyRetryHandler(
@@ -65,15 +122,23 @@ class SlackTools_bot(SlackTools):
                         backoff_factor=2,
                         jitter=RandomJitter(),
                     ),
+                    on_rate_limited=self._on_rate_limited,
                 )
             ]
         )
-        if self.verbose:
-            result = self.client.auth_test()
-            print(
-                f"{self.__class__.__name__} authentication test:\n" \
-                + f"{result}"
-            )
+
+
+    def _rate_limit_keys(self, request)->tuple:
+        ''' Returns the (API method, channel) of a request, for the rate limiter '''
+        method = request.url.rsplit('/', 1)[-1]
+        channel = None
+        if request.data:
+            data = request.data.decode('utf-8') if isinstance(request.data, bytes) else request.data
+            try:
+                channel = json.loads(data).get('channel')
+            except (ValueError, AttributeError):
+                channel = parse_qs(data).get('channel', [None])[0]
+        return method, channel
 
 
     # Danger! Must use SLACK_BOT_TOKEN with OAuth Scope set for chat:write
@@ -191,31 +256,149 @@ class SlackTools_bot(SlackTools):
                 channel_name=channel_name,
                 channel_id=channel_id
             )
-            if len(blocks) >= 1 or len(attachments) >= 1 or len(text) >=1:
-                # Send the message
-                response = self.client.chat_postMessage(
-                    channel=channel_id,
-                    text=text,
-                    blocks=blocks,
-                    attachments=attachments,
-                )
         except Exception as error:
             print(f"<?> Error sending message to slack: {error}")
             return -1
 
+        if len(blocks) >= 1 or len(attachments) >= 1 or len(text) >=1:
+            return self._deliver(channel_id, blocks, attachments, text)
+
+
+    def _post(self, channel_id:str, blocks:list, attachments:list, text:str):
+        ''' Posts an already parsed message to Slack (blocking), raises on failure '''
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire("chat.postMessage", channel_id)
+        # Send the message
+        return self.client.chat_postMessage(
+            channel=channel_id,
+            text=text,
+            blocks=blocks,
+            attachments=attachments,
+        )
+
+
+    def _retry_handlers(self, destination:str)->list:
+        return self.client.retry_handlers
+
+
+    def broadcast(
+            self,
+            blocks:list=[],
+            attachments:list=[],
+            text:str='',
+            channels:list=[],
+            max_workers:int=8
+        )->list:
+        ''' Posts the same message to many channels in parallel
+        Tags are resolved and the payload is serialized once, then posted to every channel
+        through a pool of max_workers threads, within the rate limits when rate_limit is set.
+        channels:list = channel names (from the config file) or channel IDs,
+        Returns one dict per channel, in order: {"channel", "channel_id", "ok", "ts", "error"}
+        '''
+        from concurrent.futures import ThreadPoolExecutor
+
+        # Convert @name to Slack user ID <@####>, once for every channel
+        text = self.parse_tags(text)
+        self.parse_tags(blocks)
+        self.parse_tags(attachments)
+        payload = {
+            "text": text,
+            "blocks": json.dumps(blocks),
+            "attachments": json.dumps(attachments),
+        }
+
+        size = len(json.dumps(payload)) if self.metrics is not None else 0
+        results = self._broadcast_results(channels)
+
+        def post(result):
+            if result["error"] is not None:
+                return
+            channel_id = result["channel_id"]
+            try:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire("chat.postMessage", channel_id)
+                response = self._recorded(
+                    "message", channel_id, size,
+                    self.client.api_call, "chat.postMessage", data=dict(payload, channel=channel_id))
+                result["ok"] = True
+                result["ts"] = response.get("ts")
+            except Exception as error:
+                print(f"<?> Error sending message to slack channel {result['channel']}: {error}")
+                result["error"] = str(error)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(results)))) as pool:
+            list(pool.map(post, results))
+        return results
+
+
+    def _broadcast_results(self, channels:list)->list:
+        ''' One result per channel of a broadcast, with the channel names converted to IDs
+        Unknown channel names are given an error instead of being posted to
+        '''
+        results = []
+        for channel in channels:
+            result = {"channel": channel, "channel_id": None, "ok": False, "ts": None, "error": None}
+            try:
+                result["channel_id"] = self.check_channel(channel_name=channel)
+            except KeyError as error:
+                if CHANNEL_ID.match(channel):
+                    result["channel_id"] = channel
+                else:
+                    print(f"<?> Error sending message to slack channel {channel}: {error.args[0]}")
+                    result["error"] = error.args[0]
+            results.append(result)
+        return results
+
+
+    def progress(
+            self,
+            header:str=str(),
+            channel_name:str=str(),
+            channel_id:str=str(),
+            mode:str='update',
+            interval:float=2.
+        ):
+        ''' Returns a ProgressReporter posting a single message, updated as progress is reported
+        header:str = optional title, kept above every report,
+        mode:str = 'update' to edit the message in place, 'thread' to reply in its thread,
+        interval:float = minimum seconds between two messages sent to Slack
+        Usage:
+            with slack.progress("Training") as progress:
+                for epoch in range(epochs):
+                    progress.update(f"epoch {epoch}: loss {loss:.3f}")
+        '''
+        try:
+            from .progressReporter import ProgressReporter
+        except ImportError:
+            from progressReporter import ProgressReporter
+
+        channel_id = self.check_channel(channel_name=channel_name, channel_id=channel_id)
+        return ProgressReporter(self, channel_id, header=header, mode=mode, interval=interval)
+
 
     # Danger! Must use SLACK_BOT_TOKEN with OAuth Scope set for files:write
     def send_file(
             self,
-            filepath:str="avatar.png",
+            filepath="avatar.png",
             title:str=str(),
             message:str=str(),
             channel_name:str=str(),
-            channel_id:str=str()
+            channel_id:str=str(),
+            progress=None,
+            background:bool=False,
+            filename:str=None
         ):
         '''
         Uploads a file to Slack.
+        The file is streamed in chunks, so memory use does not depend on its size.
         Note, requires the `files:write` scope enabled for the token
+        filepath = path of the file, or its content: bytes, bytearray, memoryview,
+            a binary file object (uploaded from its current position) or a matplotlib
+            figure (rendered in memory), none of them is written to disk,
+        progress = optional callable(bytes_sent:int, bytes_total:int),
+        background:bool = upload from a background thread and return immediately,
+        filename:str = name of the file in Slack, defaults to the file's name,
+            or 'figure.png' for figures (its extension sets the image format)
         '''
         try:
             # Convert channel name to channel ID
@@ -223,22 +406,258 @@ class SlackTools_bot(SlackTools):
                 channel_name=channel_name,
                 channel_id=channel_id
                 )
+        except Exception as error:
+            print(f"<?> Error uploading file to slack: {error}")
+            return -1
 
-            # Tweak
-            if not title:
-                title = filepath.split('/')[-1]
+        if background:
+            if hasattr(filepath, 'savefig'):
+                # matplotlib is not thread safe, render the figure now
+                try:
+                    from .fileUpload import render_figure
+                except ImportError:
+                    from fileUpload import render_figure
+                filepath, filename = render_figure(filepath, filename)
+            if self.send_queue is not None:
+                return self._dispatch(
+                    self._upload, filepath, title, message, channel_id, progress, filename)
+            threading.Thread(
+                target=self._upload,
+                args=(filepath, title, message, channel_id, progress, filename),
+                name=f"{self.__class__.__name__}.send_file"
+            ).start()
+            return None
+        return self._upload(filepath, title, message, channel_id, progress, filename)
 
-            # Upload the file
-            response = self.client.files_upload_v2(
-                channel=channel_id,
-                file=filepath,
-                title=title,
-                initial_comment=message
-            )
-            assert response.status_code == 200
-        except AssertionError as error:
+
+    def _upload(
+            self,
+            source,
+            title:str,
+            message:str,
+            channel_id:str,
+            progress=None,
+            filename:str=None
+        ):
+        ''' Uploads a file through the external upload URL flow (blocking)
+        See https://api.slack.com/messaging/files#upload
+        '''
+        try:
+            from .fileUpload import open_source
+        except ImportError:
+            from fileUpload import open_source
+
+        record = None
+        try:
+            with open_source(source, filename) as (stream, filename, length):
+                if self.metrics is not None:
+                    record = self._start_record("file", channel_id, length)
+                # Tweak
+                if not title:
+                    title = filename
+                if self.client.proxy:
+                    # Streaming does not go through proxies, let slack_sdk upload it
+                    content = bytes(stream.read())
+                    response = self._upload_via_sdk([content], [title], message, channel_id, [filename])
+                else:
+                    file_id = self._upload_stream(stream, filename, length, progress)
+                    response = self._complete_upload([file_id], [title], message, channel_id)
+        except Exception as error:
+            if record is not None:
+                self._finish_record(record, error=error)
             print(f"<?> Error uploading file to slack: {error}")
             return -1
+        if record is not None:
+            self._finish_record(record, response=response)
+
+
+    def _upload_external(self, filepath:str, progress=None)->str:
+        ''' Streams a file to an external upload URL, returns its file ID (not shared yet) '''
+        with open(filepath, 'rb') as file:
+            return self._upload_stream(
+                file, os.path.basename(filepath), os.path.getsize(filepath), progress)
+
+
+    def _upload_stream(self, file, filename:str, length:int, progress=None)->str:
+        ''' Streams length bytes of a binary file object to an external upload URL,
+        returns its file ID (not shared yet)
+        '''
+        try:
+            from .fileUpload import stream_upload
+        except ImportError:
+            from fileUpload import stream_upload
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire("files.getUploadURLExternal")
+        response = self.client.files_getUploadURLExternal(
+            filename=filename,
+            length=length
+        )
+        status = stream_upload(
+            response["upload_url"],
+            file,
+            length,
+            progress=progress,
+            ssl_context=self.client.ssl
+        )
+        assert status == 200, f"upload failed with HTTP status {status}"
+        return response["file_id"]
+
+
+    def _post_snippet(self, channel_id:str, blocks:list, attachments:list, text:str):
+        ''' Uploads a message too long to be posted as a text file (blocking), raises on failure '''
+        try:
+            from .payloadGuard import message_text, MAX_SECTION_TEXT
+        except ImportError:
+            from payloadGuard import message_text, MAX_SECTION_TEXT
+
+        content = message_text(blocks, attachments, text).encode('utf-8')
+        return self._post_content(channel_id, content, "message.txt", text[:MAX_SECTION_TEXT])
+
+
+    def _post_content(self, channel_id:str, content:bytes, filename:str, comment:str):
+        ''' Uploads in-memory content as a file (blocking), raises on failure '''
+        import io
+        if self.client.proxy:
+            response = self.client.files_upload_v2(
+                channel=channel_id, content=content, filename=filename,
+                initial_comment=comment)
+            assert response.status_code == 200
+            return response
+        file_id = self._upload_stream(io.BytesIO(content), filename, len(content))
+        return self._complete_upload([file_id], [filename], comment, channel_id)
+
+
+    def _complete_upload(self, file_ids:list, titles:list, message:str, channel_id:str):
+        ''' Shares uploaded files in a channel with a single files.completeUploadExternal call '''
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire("files.completeUploadExternal", channel_id)
+        response = self.client.files_completeUploadExternal(
+            files=[{"id": file_id, "title": title} for file_id, title in zip(file_ids, titles)],
+            channel_id=channel_id,
+            initial_comment=message
+        )
+        assert response.status_code == 200
+        return response
+
+
+    def _upload_via_sdk(
+            self,
+            filepaths:list,
+            titles:list,
+            message:str,
+            channel_id:str,
+            filenames:list=None
+        ):
+        ''' Uploads files (paths or bytes) with files_upload_v2 (reads each file in memory) '''
+        if self.rate_limiter is not None:
+            for _ in filepaths:
+                self.rate_limiter.acquire("files.getUploadURLExternal")
+            self.rate_limiter.acquire("files.completeUploadExternal", channel_id)
+        file_uploads = [
+            {"file": filepath, "title": title} for filepath, title in zip(filepaths, titles)
+        ]
+        for upload, filename in zip(file_uploads, filenames or []):
+            upload["filename"] = filename
+        response = self.client.files_upload_v2(
+            channel=channel_id,
+            file_uploads=file_uploads,
+            initial_comment=message
+        )
+        assert response.status_code == 200
+        return response
+
+
+    # Danger! Must use SLACK_BOT_TOKEN with OAuth Scope set for files:write
+    def send_files(
+            self,
+            filepaths:list,
+            titles:list=None,
+            message:str=str(),
+            channel_name:str=str(),
+            channel_id:str=str(),
+            max_workers:int=4,
+            progress=None
+        )->list:
+        '''
+        Uploads several files to Slack in parallel.
+        Files are streamed through a pool of max_workers threads, then shared in groups of
+        MAX_FILES_PER_SHARE with one files.completeUploadExternal call (and message) per group.
+        Note, requires the `files:write` scope enabled for the token
+        titles:list = one title per file, defaults to the file names,
+        progress = optional callable(filepath:str, bytes_sent:int, bytes_total:int),
+        Returns one dict per file, in order: {"filepath", "file_id", "ok", "error"}
+        '''
+        from concurrent.futures import ThreadPoolExecutor
+
+        filepaths = list(filepaths)
+        if not titles:
+            titles = [filepath.split('/')[-1] for filepath in filepaths]
+        results = [
+            {"filepath": filepath, "file_id": None, "ok": False, "error": None}
+            for filepath in filepaths
+        ]
+
+        try:
+            # Convert channel name to channel ID
+            channel_id = self.check_channel(
+                channel_name=channel_name,
+                channel_id=channel_id
+                )
+            if self.client.proxy:
+                # Streaming does not go through proxies, let slack_sdk upload them
+                self._upload_via_sdk(filepaths, titles, message, channel_id)
+                for result in results:
+                    result["ok"] = True
+                return results
+        except Exception as error:
+            print(f"<?> Error uploading files to slack: {error}")
+            for result in results:
+                result["error"] = str(error)
+            return results
+
+        def upload(result):
+            record = None
+            if self.metrics is not None:
+                filepath = result["filepath"]
+                size = os.path.getsize(filepath) if os.path.isfile(filepath) else 0
+                record = self._start_record("file", channel_id, size)
+            try:
+                result["file_id"] = self._upload_external(
+                    result["filepath"],
+                    None if progress is None else
+                        lambda sent, total: progress(result["filepath"], sent, total)
+                )
+            except Exception as error:
+                if record is not None:
+                    self._finish_record(record, error=error)
+                print(f"<?> Error uploading file {result['filepath']} to slack: {error}")
+                result["error"] = str(error)
+            else:
+                if record is not None:
+                    self._finish_record(record)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(upload, results))
+
+        # Share the uploaded files, the message goes with the first group
+        uploaded = [(result, title) for result, title in zip(results, titles) if result["file_id"]]
+        for i in range(0, len(uploaded), self.MAX_FILES_PER_SHARE):
+            group = uploaded[i:i + self.MAX_FILES_PER_SHARE]
+            try:
+                self._complete_upload(
+                    [result["file_id"] for result, _ in group],
+                    [title for _, title in group],
+                    message if i == 0 else str(),
+                    channel_id
+                )
+                for result, _ in group:
+                    result["ok"] = True
+            except Exception as error:
+                print(f"<?> Error sharing files on slack: {error}")
+                for result, _ in group:
+                    result["error"] = str(error)
+        return results
 
 
 # TESTING
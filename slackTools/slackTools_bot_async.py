@@ -0,0 +1,299 @@
+# Standard Library
+import os
+import json
+import asyncio
+
+# Slack
+from slack_sdk.web.async_client import AsyncWebClient
+from slack_sdk.http_retry.jitter import RandomJitter
+from slack_sdk.http_retry.builtin_interval_calculators import BackoffRetryIntervalCalculator
+
+# Custom
+try:
+    from .slackTools_bot import SlackTools_bot
+    from .retryHandler import MyAsyncRetryHandler
+    from .payloadGuard import MAX_PARTS, MAX_PAYLOAD_BYTES
+except:
+    from slackTools_bot import SlackTools_bot
+    from retryHandler import MyAsyncRetryHandler
+    from payloadGuard import MAX_PARTS, MAX_PAYLOAD_BYTES
+
+
+## BOT_TOKEN (asyncio) ##
+
+class AsyncSlackTools_bot(SlackTools_bot):
+    '''asyncio variant of SlackTools_bot, built on AsyncWebClient
+    send_message, send_markdown, send_block and send_file (and msg, write, upload)
+    return awaitables, so many notifications can be in flight without threads.
+    Messages are posted directly from the event loop: the background delivery options
+    (non_blocking, batch_window, rate_limit, outbox, metrics, relay, dedup_ttl) are not
+    supported, nor are send_files, progress and log_handler.
+    Requires aiohttp.
+    '''
+
+    UNSUPPORTED_OPTIONS = (
+        'non_blocking', 'batch_window', 'rate_limit', 'outbox', 'metrics', 'relay', 'dedup_ttl')
+
+    def init_slack(self, *args):
+        ''' Initializes SlackTools config for interacting with slack'''
+        super().init_slack(*args)
+        self._tasks = set()
+
+
+    def _auth_test(self):
+        ''' Skipped, as it cannot be awaited during initialization '''
+
+
+    def _create_client(self):
+        ''' Initializes the client '''
+        return AsyncWebClient(
+            self.slack_token,
+            retry_handlers=[
+                MyAsyncRetryHandler(
+                    max_retry_count=3,
+                    interval_calculator=BackoffRetryIntervalCalculator(
+                        backoff_factor=2,
+                        jitter=RandomJitter(),
+                    ),
+                    on_rate_limited=self._on_rate_limited,
+                )
+            ]
+        )
+
+
+    def _notify_event(self, message:str):
+        ''' Sends an initialization/termination notification
+        Scheduled on the running event loop, or sent from a daemon thread if there is none
+        '''
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            super()._notify_event(message)
+        else:
+            # Keep a reference until done, the loop only holds weak references to tasks
+            task = loop.create_task(
+                asyncio.wait_for(self.send_markdown(message), self.notify_timeout))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+
+    def _send_notification(self, message:str):
+        ''' Delivers a lifecycle notification (runs on a notification thread) '''
+        try:
+            asyncio.run(asyncio.wait_for(self.send_markdown(message), self.notify_timeout))
+        except asyncio.TimeoutError:
+            print("<?> Error sending message to slack: notification timed out")
+
+
+    async def send_block(
+            self,
+            blocks:list=[],
+            attachments:list=[],
+            text:str='',
+            channel_name:str=str(),
+            channel_id:str=str()
+        ):
+        ''' Send Block Kit primitives to Slack
+        See https://api.slack.com/reference/block-kit/blocks#image
+        See https://api.slack.com/messaging/composing/layouts#when-to-use-attachments
+        '''
+
+        # Convert @name to Slack user ID <@####>
+        self.parse_tags(text)
+        self.parse_tags(blocks)
+        self.parse_tags(attachments)
+        try:
+            # Convert channel name to channel ID
+            channel_id = self.check_channel(
+                channel_name=channel_name,
+                channel_id=channel_id
+            )
+        except Exception as error:
+            print(f"<?> Error sending message to slack: {error}")
+            return -1
+
+        if len(blocks) >= 1 or len(attachments) >= 1 or len(text) >=1:
+            return await self._post(channel_id, blocks, attachments, text)
+
+
+    async def _post(self, channel_id:str, blocks:list, attachments:list, text:str):
+        ''' Posts an already parsed message to Slack '''
+        try:
+            # Send the message
+            await self.client.chat_postMessage(
+                channel=channel_id,
+                text=text,
+                blocks=blocks,
+                attachments=attachments,
+            )
+        except Exception as error:
+            print(f"<?> Error sending message to slack: {error}")
+            return -1
+
+
+    async def broadcast(
+            self,
+            blocks:list=[],
+            attachments:list=[],
+            text:str='',
+            channels:list=[],
+            max_workers:int=8
+        )->list:
+        ''' Posts the same message to many channels concurrently
+        See SlackTools_bot.broadcast, max_workers bounds the requests in flight
+        '''
+        text = self.parse_tags(text)
+        self.parse_tags(blocks)
+        self.parse_tags(attachments)
+        payload = {
+            "text": text,
+            "blocks": json.dumps(blocks),
+            "attachments": json.dumps(attachments),
+        }
+
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def post(result):
+            if result["error"] is not None:
+                return result
+            try:
+                async with semaphore:
+                    response = await self.client.api_call(
+                        "chat.postMessage", data=dict(payload, channel=result["channel_id"]))
+                result["ok"] = True
+                result["ts"] = response.get("ts")
+            except Exception as error:
+                print(f"<?> Error sending message to slack channel {result['channel']}: {error}")
+                result["error"] = str(error)
+            return result
+
+        return list(await asyncio.gather(*[post(result) for result in self._broadcast_results(channels)]))
+
+
+    async def send_table(
+            self,
+            data,
+            title:str=str(),
+            columns:list=None,
+            float_format:str='.4g',
+            layout:str='code',
+            channel_name:str=str(),
+            channel_id:str=str()
+        ):
+        ''' Posts a table, see SlackTools.send_table
+        Tables that would take more than MAX_PARTS messages are uploaded as a CSV file
+        '''
+        try:
+            from .blocks.table import Table
+        except ImportError:
+            from blocks.table import Table
+
+        table = Table(data, columns=columns, float_format=float_format)
+        text = title or f"Table of {table.rows} rows"
+        if table.text_size() > MAX_PARTS * MAX_PAYLOAD_BYTES:
+            return await self.send_file(
+                table.csv(),
+                message=self.parse_tags(text),
+                channel_name=channel_name,
+                channel_id=channel_id,
+                filename=f"{(title or 'table').replace('/', '_')}.csv"
+            )
+        return await self.send_block(
+            blocks=table.blocks(title, layout),
+            text=text,
+            channel_name=channel_name,
+            channel_id=channel_id
+        )
+
+
+    def send_files(self, *args, **kwargs):
+        ''' Placeholder '''
+        raise NotImplementedError(
+                "AsyncSlackTools_bot.send_files(...) is not supported." \
+                + " Please await send_file for each file, or use SlackTools_bot.")
+
+
+    def progress(self, *args, **kwargs):
+        ''' Placeholder '''
+        raise NotImplementedError(
+                "AsyncSlackTools_bot.progress(...) is not supported." \
+                + " Please use SlackTools_bot.")
+
+
+    def log_handler(self, *args, **kwargs):
+        ''' Placeholder '''
+        raise NotImplementedError(
+                "AsyncSlackTools_bot.log_handler(...) is not supported." \
+                + " Please use SlackTools_bot.")
+
+
+    # Danger! Must use SLACK_BOT_TOKEN with OAuth Scope set for files:write
+    async def send_file(
+            self,
+            filepath="avatar.png",
+            title:str=str(),
+            message:str=str(),
+            channel_name:str=str(),
+            channel_id:str=str(),
+            filename:str=None
+        ):
+        '''
+        Uploads a file to Slack.
+        Note, requires the `files:write` scope enabled for the token
+        filepath = path of the file, or its content: bytes, bytearray, memoryview,
+            a binary file object or a matplotlib figure (rendered in memory),
+        filename:str = name of the file in Slack, defaults to the file's name,
+            or 'figure.png' for figures (its extension sets the image format)
+        '''
+        try:
+            # Convert channel name to channel ID
+            channel_id = self.check_channel(
+                channel_name=channel_name,
+                channel_id=channel_id
+                )
+
+            if hasattr(filepath, 'savefig'):
+                try:
+                    from .fileUpload import render_figure
+                except ImportError:
+                    from fileUpload import render_figure
+                filepath, filename = render_figure(filepath, filename)
+            if isinstance(filepath, os.PathLike):
+                filepath = os.fspath(filepath)
+            elif isinstance(filepath, (bytearray, memoryview)):
+                # slack_sdk only reads paths, bytes and file objects
+                filepath = bytes(filepath)
+
+            if not isinstance(filepath, str):
+                filename = filename or os.path.basename(str(getattr(filepath, 'name', ''))) or "file"
+
+            # Tweak
+            if not title:
+                title = filename or filepath.split('/')[-1]
+
+            # Upload the file
+            response = await self.client.files_upload_v2(
+                channel=channel_id,
+                file=filepath,
+                filename=filename,
+                title=title,
+                initial_comment=message
+            )
+            assert response.status_code == 200
+        except Exception as error:
+            print(f"<?> Error uploading file to slack: {error}")
+            return -1
+
+
+# TESTING
+if __name__ == "__main__":
+    async def main():
+        test = AsyncSlackTools_bot("slack.key.toml", notify_init_del=False)
+        await asyncio.gather(
+            test.send_message(),
+            test.msg("~Test msg~ \n> *Markdown* _world_`!!` @ian @steve"),
+            test.send_markdown(message="Nothing to see here"),
+            test.write("Hello World"),
+        )
+        await test.send_file(message="Don't worry about it", filepath="./avatar.png")
+    asyncio.run(main())
@@ -1,14 +1,13 @@
-# Slack
-from slack_sdk.webhook import WebhookClient
-
+# Standard Library
+import threading
 
 # Custom
+# Note, slack_sdk and the modules depending on it are imported on first use
+# to keep `import slackTools` fast (see benchmarks/bench_import.py)
 try:
     from .slackTools import SlackTools
-    from .retryHandler import MyRetryHandler
 except:
     from slackTools import SlackTools
-    from retryHandler import MyRetryHandler
 
 
 ## WEBHOOK  ##
@@ -21,20 +20,34 @@ class SlackTools_webhook(SlackTools):
     when sending messages.  
     '''
 
-    _instance_SlackTools_webhook = None
+    RELAY_CLIENT = 'SlackTools_webhook'
+
     def __new__(cls, *args, **kwargs):
-        ''' Initializes SlackTools_webhook
+        ''' Initializes SlackTools_webhook, or returns the existing instance for the same keys file and token
         var slack_token:str = slack API token,
         var hostname:str = optional identifier for the SlackTools instance, 
             if 'rnd' then it will be randomly generated,
             if '' then it will be kept blank
 
         notify_init_del:bool = whether to notify on initialization and destruction,
+        notify_timeout:float = seconds allowed at exit for pending messages and notifications,
+        non_blocking:bool = deliver messages from a background thread instead of the caller's,
+        queue_size:int = maximum number of pending messages when non_blocking,
+        queue_overflow:str = policy when the queue is full ('block', 'drop_oldest' or 'drop_newest'),
+        batch_window:float = seconds during which messages to the same destination are merged,
+        rate_limit:bool = schedule requests with a token bucket per webhook,
+        outbox:bool = keep undelivered messages on disk and send them once connectivity returns,
+        outbox_max_entries:int = maximum number of messages kept in the outbox,
+        metrics = hook called with a record (dict) after each send, e.g. a Metrics instance or True,
+        relay = hand messages to the local relay daemon when running, True or its socket path,
         verbose:bool = be verbose
         '''
-        if cls._instance_SlackTools_webhook is None:
-            cls._instance_SlackTools_webhook = super(SlackTools_webhook, cls).__new__(cls)
-        return cls._instance_SlackTools
+        return super(SlackTools_webhook, cls).__new__(cls, *args, **kwargs)
+
+
+    @classmethod
+    def _resolve_token(cls, config, slack_token:str=str())->str:
+        return slack_token or config.webhooks.get('TOKEN')
 
     def init_slack(
             self,
@@ -49,16 +62,48 @@ class SlackTools_webhook(SlackTools):
         else:
             self.slack_token = self.config['SLACK_WEBHOOK']['TOKEN']
 
+        # One pooled client per resolved webhook URL
+        self.webhooks = {}
+        self._webhooks_lock = threading.Lock()
+
 
     def check_webhook_token(self, token:str=str()):
         '''Checks webhook token'''
-        if token and token in self.config['SLACK_WEBHOOK'].keys():
-            return self.config['SLACK_WEBHOOK'][token]
+        webhooks = self.config.webhooks
+        if token and token in webhooks:
+            return webhooks[token]
         else:
             # Assume it is correct
             return self.slack_token
 
 
+    def get_webhook(self, webhook_token:str):
+        '''Returns the cached PooledWebhookClient for a resolved webhook token, creating it if needed'''
+        webhook = self.webhooks.get(webhook_token)
+        if webhook is None:
+            with self._webhooks_lock:
+                webhook = self.webhooks.get(webhook_token)
+                if webhook is None:
+                    try:
+                        from .retryHandler import MyRetryHandler
+                        from .connectionPool import PooledWebhookClient
+                    except ImportError:
+                        from retryHandler import MyRetryHandler
+                        from connectionPool import PooledWebhookClient
+                    webhook = PooledWebhookClient(
+                        webhook_token,
+                        timeout=3,
+                        retry_handlers=[MyRetryHandler(on_rate_limited=self._on_rate_limited)]
+                    )
+                    self.webhooks[webhook_token] = webhook
+        return webhook
+
+
+    def _rate_limit_keys(self, request)->tuple:
+        ''' Each webhook posts to a single channel, its URL identifies the channel '''
+        return "webhook", request.url
+
+
     def send_message(
             self,
             message:str="Hello World Message!!",
@@ -162,21 +207,31 @@ class SlackTools_webhook(SlackTools):
         self.parse_tags(text)
         self.parse_tags(blocks)
         self.parse_tags(attachments)
-        try:
-            webhook_token = self.check_webhook_token(webhook_token)
-            webhook = WebhookClient(webhook_token, timeout=3, retry_handlers=[MyRetryHandler()])
-            if len(blocks) >= 1 or len(attachments) >= 1 or len(text) >=1:
-                # Send the message
-                response = webhook.send(
-                    text=text,
-                    blocks=blocks,
-                    attachments=attachments
-                )
-                assert response.status_code == 200
-                assert response.body == "ok"
-        except Exception as error:
-            print(f"<?> Error sending message to slack: {error}")
-            return -1
+        webhook_token = self.check_webhook_token(webhook_token)
+        if len(blocks) >= 1 or len(attachments) >= 1 or len(text) >=1:
+            return self._deliver(webhook_token, blocks, attachments, text)
+
+
+    def _post(self, webhook_token:str, blocks:list, attachments:list, text:str):
+        ''' Posts an already parsed message to Slack (blocking), raises on failure '''
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire("webhook", webhook_token)
+        webhook = self.get_webhook(webhook_token)
+        # Send the message
+        response = webhook.send(
+            text=text,
+            blocks=blocks,
+            attachments=attachments
+        )
+        if response.status_code != 200 or response.body != "ok":
+            from slack_sdk.errors import SlackApiError
+            raise SlackApiError(
+                f"webhook returned HTTP {response.status_code}: {response.body}", response)
+        return response
+
+
+    def _retry_handlers(self, destination:str)->list:
+        return self.get_webhook(destination).retry_handlers
 
 
 # TESTING
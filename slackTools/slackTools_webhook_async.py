@@ -0,0 +1,133 @@
+# Standard Library
+import asyncio
+
+# Slack
+from slack_sdk.webhook.async_client import AsyncWebhookClient
+
+# Custom
+try:
+    from .slackTools_webhook import SlackTools_webhook
+    from .retryHandler import MyAsyncRetryHandler
+except:
+    from slackTools_webhook import SlackTools_webhook
+    from retryHandler import MyAsyncRetryHandler
+
+
+## WEBHOOK (asyncio) ##
+class AsyncSlackTools_webhook(SlackTools_webhook):
+    '''asyncio variant of SlackTools_webhook, built on AsyncWebhookClient
+    send_message, send_markdown and send_block (and msg, write) return awaitables,
+    so many notifications can be in flight without threads.
+    Messages are posted directly from the event loop: the background delivery options
+    (non_blocking, batch_window, rate_limit, outbox, metrics, relay, dedup_ttl) are not
+    supported, nor is log_handler.
+    Requires aiohttp.
+    '''
+
+    UNSUPPORTED_OPTIONS = (
+        'non_blocking', 'batch_window', 'rate_limit', 'outbox', 'metrics', 'relay', 'dedup_ttl')
+
+    def init_slack(
+            self,
+            slack_token:str=str(),
+            *args
+        ):
+        ''' Initializes SlackTools config for interacting with slack'''
+        super().init_slack(slack_token, *args)
+        self._tasks = set()
+
+
+    def _notify_event(self, message:str):
+        ''' Sends an initialization/termination notification
+        Scheduled on the running event loop, or sent from a daemon thread if there is none
+        '''
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            super()._notify_event(message)
+        else:
+            # Keep a reference until done, the loop only holds weak references to tasks
+            task = loop.create_task(
+                asyncio.wait_for(self.send_markdown(message), self.notify_timeout))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+
+    def _send_notification(self, message:str):
+        ''' Delivers a lifecycle notification (runs on a notification thread) '''
+        try:
+            asyncio.run(asyncio.wait_for(self.send_markdown(message), self.notify_timeout))
+        except asyncio.TimeoutError:
+            print("<?> Error sending message to slack: notification timed out")
+
+
+    def log_handler(self, *args, **kwargs):
+        ''' Placeholder '''
+        raise NotImplementedError(
+                "AsyncSlackTools_webhook.log_handler(...) is not supported." \
+                + " Please use SlackTools_webhook.")
+
+
+    async def send_block(
+            self,
+            blocks:list=[],
+            attachments:list=[],
+            text:str='',
+            webhook_token:str=str()
+        ):
+        ''' Send Block Kit primitives to Slack via a webhook
+        See https://api.slack.com/reference/block-kit/blocks#image
+        See https://api.slack.com/messaging/composing/layouts#when-to-use-attachments
+        '''
+
+        # Convert @name to Slack user ID <@####>
+        self.parse_tags(text)
+        self.parse_tags(blocks)
+        self.parse_tags(attachments)
+        webhook_token = self.check_webhook_token(webhook_token)
+        if len(blocks) >= 1 or len(attachments) >= 1 or len(text) >=1:
+            return await self._post(webhook_token, blocks, attachments, text)
+
+
+    def get_webhook(self, webhook_token:str):
+        '''Returns the cached AsyncWebhookClient for a resolved webhook token, creating it if needed'''
+        webhook = self.webhooks.get(webhook_token)
+        if webhook is None:
+            with self._webhooks_lock:
+                webhook = self.webhooks.get(webhook_token)
+                if webhook is None:
+                    webhook = AsyncWebhookClient(
+                        webhook_token,
+                        timeout=3,
+                        retry_handlers=[MyAsyncRetryHandler(on_rate_limited=self._on_rate_limited)]
+                    )
+                    self.webhooks[webhook_token] = webhook
+        return webhook
+
+
+    async def _post(self, webhook_token:str, blocks:list, attachments:list, text:str):
+        ''' Posts an already parsed message to Slack '''
+        try:
+            webhook = self.get_webhook(webhook_token)
+            # Send the message
+            response = await webhook.send(
+                text=text,
+                blocks=blocks,
+                attachments=attachments
+            )
+            assert response.status_code == 200
+            assert response.body == "ok"
+        except Exception as error:
+            print(f"<?> Error sending message to slack: {error}")
+            return -1
+
+
+# TESTING
+if __name__ == "__main__":
+    async def main():
+        test = AsyncSlackTools_webhook("slack.key.toml", notify_init_del=False)
+        await asyncio.gather(
+            test.write("~Test write~ \n> *Markdown* _world_`!!` @ian"),
+            test.msg("~Test msg~ \n> *Markdown* _world_`!!` @ian @steve"),
+        )
+    asyncio.run(main())
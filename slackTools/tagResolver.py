@@ -0,0 +1,42 @@
+# Standard Library
+import re
+from functools import lru_cache
+
+
+class TagResolver:
+    ''' Resolves @name tags to the corresponding slack ID
+    Built once from the SLACK_USERS table, resolved strings are cached.
+
+    var users:dict = SLACK_USERS table from the keys config,
+    var fallback = callable(name)->str used for names that are not in users,
+        if None, unknown names are left unmodified
+    var cache_size:int = number of resolved strings to remember
+    '''
+
+    def __init__(self, users:dict, fallback=None, cache_size:int=4096):
+        self.source = users
+        self.users = dict(users)
+        self.fallback = fallback
+
+        # A tag spans up to the next space. Matching any name and looking it up in a
+        # dict is faster than an alternation of every known name in Python's re engine.
+        self.pattern = re.compile(r' @([^ ]*)')
+
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+
+    def _lookup(self, match)->str:
+        name = match.group(1)
+        if name in self.users:
+            return self.users[name]
+        if self.fallback is not None:
+            return self.fallback(name)
+        # Return unmodified.
+        return match.group(0)
+
+
+    def _resolve(self, text:str)->str:
+        ''' Returns text with every @name tag replaced '''
+        if ' @' not in text or not self.users and self.fallback is None:
+            return text
+        return self.pattern.sub(self._lookup, text)